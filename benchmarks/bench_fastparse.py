@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+'''
+compare the cost of parsing arguments with and without `attrs(fast_parse=True)`.
+
+usage: python benchmarks/bench_fastparse.py [NUMBER]
+'''
+
+import sys
+import timeit
+from enum import Enum
+
+from click_anno import command, attrs, flag
+
+class Color(Enum):
+    red = 1
+    blue = 2
+
+def run(name: str, count: int, *, ratio: float = 0.5, color: Color = Color.red, verbose: flag = False):
+    pass
+
+ARGS = ['name', '10', '--ratio', '2.5', '--color', 'blue', '--verbose']
+
+def bench(cmd, number: int) -> float:
+    return timeit.timeit(lambda: cmd.main(list(ARGS), 'bench', standalone_mode=False), number=number)
+
+def main(number: int = 20000):
+    slow = bench(command(run), number)
+    fast = bench(command(attrs(fast_parse=True)(run)), number)
+    print(f'click:      {slow / number * 1e6:8.2f} us/call')
+    print(f'fast_parse: {fast / number * 1e6:8.2f} us/call ({slow / fast:.2f}x)')
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
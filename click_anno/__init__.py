@@ -5,22 +5,40 @@
 #
 # ----------
 
-from .core import (
-    click_app, command, anno
-)
-from .injectors import (
-    find, ensure, Injectable, inject
-)
-from .utils import (
-    attrs
-)
-from .types import (
-    flag, register_param_type
-)
+# the public api are resolved lazily via `__getattr__`,
+# so `import click_anno` is cheap for tiny cli.
+_LAZY_ATTRS = {
+    'click_app': 'core', 'command': 'core', 'anno': 'core',
+    'find': 'injectors', 'ensure': 'injectors', 'Injectable': 'injectors', 'inject': 'injectors',
+    'inject_pool': 'injectors',
+    'attrs': 'utils',
+    'flag': 'types', 'stream': 'types', 'lazy_default': 'types', 'params': 'types', 'choice': 'types',
+    'register_param_type': 'types',
+    'Invoker': 'invoker',
+    'describe': 'introspect',
+    'CancellationToken': 'cancellation',
+}
 
 __all__ = [
     'click_app', 'command', 'anno',
-    'find', 'ensure', 'Injectable', 'inject',
+    'find', 'ensure', 'Injectable', 'inject', 'inject_pool',
     'attrs',
-    'flag', 'register_param_type',
+    'flag', 'stream', 'lazy_default', 'params', 'choice', 'register_param_type',
+    'Invoker',
+    'describe',
+    'CancellationToken',
 ]
+
+def __getattr__(name: str):
+    try:
+        module_name = _LAZY_ATTRS[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+
+    import importlib
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value # cache it
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+'''
+cache the results of idempotent commands on local disk.
+'''
+
+import io
+import os
+import sys
+import pickle
+import hashlib
+import tempfile
+
+import click
+
+# the name of the click parameter `--no-cache`
+NO_CACHE_PARAM_NAME = '_click_anno_no_cache'
+
+_MISSING = object()
+
+
+def _get_default_directory():
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'click_anno', 'results')
+
+
+class _TeeWriter(io.RawIOBase):
+    'write bytes into the target stream and a capture buffer.'
+
+    def __init__(self, target, capture: io.BytesIO):
+        super().__init__()
+        self._target = target
+        self._capture = capture
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._target.write(b)
+        self._capture.write(b)
+        return len(b)
+
+    def flush(self):
+        self._target.flush()
+
+
+class ResultCache:
+    '''
+    a size bounded LRU cache which store the return value and the output of commands on local disk.
+
+    the cache key is built from:
+
+    - the command and the converted values of all parameters (include the parent groups);
+    - the path, mtime and size of `files` and the files from the parameters named in `file_params`;
+    - the sha256 of these files if `hash_files` is `True`.
+
+    if any value is unable to pickle, the command will run without cache.
+    '''
+
+    def __init__(self, directory: str = None, max_size: int = 64 * 1024 * 1024,
+                 files=(), file_params=(), hash_files: bool = False):
+        self.directory = directory or _get_default_directory()
+        self.max_size = max_size
+        self.files = tuple(files)
+        self.file_params = tuple(file_params)
+        self.hash_files = hash_files
+
+    def _get_file_state(self, path: str):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return (path, None)
+        if self.hash_files:
+            with open(path, 'rb') as fp:
+                return (path, hashlib.sha256(fp.read()).hexdigest())
+        return (path, stat.st_mtime_ns, stat.st_size)
+
+    def make_key(self, identity: str, params: dict):
+        'return `None` if unable to make the key.'
+        ctx = click.get_current_context(silent=True)
+        parent_params = []
+        while ctx is not None and ctx.parent is not None:
+            ctx = ctx.parent
+            parent_params.append(sorted(ctx.params.items()))
+
+        paths = list(self.files)
+        paths.extend(params[name] for name in self.file_params if params.get(name) is not None)
+        files_state = [self._get_file_state(os.fspath(x)) for x in paths]
+
+        try:
+            data = pickle.dumps((identity, sorted(params.items()), parent_params, files_state))
+        except Exception: # unable to pickle
+            return None
+        return hashlib.sha256(data).hexdigest()
+
+    def _get_path(self, key: str):
+        return os.path.join(self.directory, key + '.pickle')
+
+    def load(self, key: str):
+        'return `(result, output)` or `None` if missing.'
+        path = self._get_path(key)
+        try:
+            with open(path, 'rb') as fp:
+                value = pickle.load(fp)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        try:
+            os.utime(path) # mark as recently used
+        except OSError:
+            pass
+        return value
+
+    def store(self, key: str, result, output: bytes):
+        try:
+            data = pickle.dumps((result, output))
+        except Exception: # unable to pickle
+            return
+        if len(data) > self.max_size:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(data)
+        os.replace(tmp_path, self._get_path(key))
+        self.evict()
+
+    def evict(self):
+        'remove the least recently used entries until the cache fit in `max_size`.'
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith('.pickle'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                    total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith('.pickle'):
+                    os.remove(os.path.join(self.directory, name))
+
+    def invoke(self, func, identity: str, params: dict):
+        '''
+        call `func()` or return the cached result, `params` are the values from click.
+        '''
+        key = self.make_key(identity, params)
+        if key is None:
+            return func()
+
+        cached = self.load(key)
+        if cached is not None:
+            result, output = cached
+            if output:
+                click.get_text_stream('stdout').flush()
+                stream = click.get_binary_stream('stdout')
+                stream.write(output)
+                stream.flush()
+            return result
+
+        capture = io.BytesIO()
+        stdout = sys.stdout
+        stdout.flush()
+        target = getattr(stdout, 'buffer', None)
+        if target is None: # unable to capture
+            return func()
+        sys.stdout = io.TextIOWrapper(_TeeWriter(target, capture),
+            encoding=stdout.encoding, errors=getattr(stdout, 'errors', None), write_through=True)
+        try:
+            result = func()
+            sys.stdout.flush()
+        finally:
+            sys.stdout = stdout
+        self.store(key, result, capture.getvalue())
+        return result
+
+
+def get_result_cache(value) -> ResultCache:
+    '''
+    get the `ResultCache` from the value of `attrs(cache=...)`.
+    '''
+    if value is True:
+        return ResultCache()
+    if isinstance(value, ResultCache):
+        return value
+    if isinstance(value, str):
+        return ResultCache(directory=value)
+    raise TypeError(f'cache must be True, a directory or a ResultCache, not {value!r}')
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+'''
+per command timeout and cooperative cancellation.
+'''
+
+import threading
+
+import click
+
+from .injectors import Injectable
+
+# the name of the click parameter `--timeout`
+TIMEOUT_PARAM_NAME = '_click_anno_timeout'
+
+_KEY_TOKEN = 'click_anno.cancellation_token'
+
+
+class OperationCancelled(Exception):
+    '''
+    raised by `CancellationToken.raise_if_cancelled()`.
+    '''
+
+
+class CommandCancelled(click.ClickException):
+    exit_code = 130
+
+    def __init__(self, message: str = 'command was cancelled.'):
+        super().__init__(message)
+
+
+class CommandTimeout(CommandCancelled):
+    exit_code = 124
+
+    def __init__(self, timeout: float):
+        super().__init__(f'command timed out after {timeout}s.')
+        self.timeout = timeout
+
+
+class CancellationToken(Injectable):
+    '''
+    a token which tell the command it should stop.
+
+    inject it by annotation:
+
+    ``` py
+    @command
+    def func(token: CancellationToken):
+        for item in items:
+            token.raise_if_cancelled()
+    ```
+    '''
+    __slots__ = ('_event', '_callbacks', '_lock', 'reason')
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self.reason = None
+
+    @classmethod
+    def __inject__(cls):
+        return get_cancellation_token(click.get_current_context())
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason=None):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def add_callback(self, callback):
+        'call `callback()` when the token is cancelled.'
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback):
+        with self._lock:
+            try:
+                self._callbacks.remove(callback)
+            except ValueError:
+                pass
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise OperationCancelled(self.reason)
+
+    def wait(self, timeout: float = None) -> bool:
+        'wait until cancelled, return whether the token was cancelled.'
+        return self._event.wait(timeout)
+
+
+def get_cancellation_token(ctx: click.Context, create: bool = True) -> CancellationToken:
+    '''
+    get the token of current invocation,
+    return `None` if it does not exists and `create` is `False`.
+    '''
+    token = ctx.meta.get(_KEY_TOKEN)
+    if token is None and create:
+        token = ctx.meta[_KEY_TOKEN] = CancellationToken()
+    return token
+
+
+def run_with_timeout(func, timeout: float):
+    '''
+    call `func()` and cancel the token of current invocation after `timeout` seconds.
+
+    `CommandTimeout` will be raised if `func` stop by the cancellation.
+    '''
+    token = get_cancellation_token(click.get_current_context())
+    timer = threading.Timer(timeout, token.cancel, args=(CommandTimeout(timeout), ))
+    timer.daemon = True
+    timer.start()
+    try:
+        return func()
+    except OperationCancelled as e:
+        reason = e.args[0] if e.args else None
+        if isinstance(reason, CommandCancelled):
+            raise reason from None
+        raise CommandCancelled() from None
+    finally:
+        timer.cancel()
+
+
+def run_coroutine(coro):
+    '''
+    run the coroutine from async command,
+    the coroutine will be cancelled when the token of current invocation is cancelled.
+    '''
+    import asyncio
+
+    ctx = click.get_current_context(silent=True)
+    token = get_cancellation_token(ctx) if ctx is not None else None
+
+    async def run():
+        task = asyncio.ensure_future(coro)
+        if token is None:
+            return await task
+
+        loop = asyncio.get_event_loop()
+        cancel_task = lambda: loop.call_soon_threadsafe(task.cancel)
+        token.add_callback(cancel_task)
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if token.cancelled:
+                raise OperationCancelled(token.reason) from None
+            raise
+        finally:
+            token.remove_callback(cancel_task)
+
+    return asyncio.run(run())
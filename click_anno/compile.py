@@ -0,0 +1,438 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+'''
+export a `click_app` class or a `command` function as a plain click module,
+so the exported cli does not need any introspection at runtime.
+
+usage:
+
+``` shell
+python -m click_anno.compile package.module:App --output cli.py
+```
+
+the compiled module does not inspect the signatures, but it still imports some runtime helpers
+from `click_anno.types`, `click_anno.output` and `click_anno.injectors`
+(e.g. the converters of arrays and streams, the writer of `attrs(output=...)`),
+so click_anno must be installed where the compiled module runs.
+'''
+
+import inspect
+import difflib
+import builtins
+import importlib
+import itertools
+from enum import Enum
+
+import click
+
+from .core import (
+    click_app, command,
+    get_build_info, BuildInfo,
+    ArgumentAdapter, ClickParameterBuilder, _Argument,
+)
+from .injectors import get_injector
+from .types import flag, _EnumChoice, _HashedChoice, _ArrayConverter, _StreamReader, get_param_type
+from .utils import load_target
+
+# anno attrs which the compiled module can reproduce
+_SUPPORTED_ANNO_ATTRS = frozenset(('output', 'reusable'))
+# the options of `CallableAdapter` which are unable to compile: (attr name, field of adapter)
+_ADAPTER_OPTIONS = (
+    ('cache', '_cache'),
+    ('timeout', '_timeout'),
+    ('memory_budget', '_memory_budget'),
+    ('progress', '_progress'),
+    ('watchdog', '_watchdog'),
+)
+
+_PRELUDE = '''\
+import threading
+
+_UNSET = object()
+
+def _set_group_factory(factory):
+    ctx = click.get_current_context()
+    ctx._click_anno_factory = factory
+    ctx._click_anno_instance = _UNSET
+    if ctx.invoked_subcommand is None:
+        _get_group_instance(ctx)
+
+def _get_group_instance(ctx):
+    instance = ctx._click_anno_instance
+    if instance is _UNSET:
+        instance = ctx._click_anno_instance = ctx._click_anno_factory()
+    return instance
+
+def _reusable(cls):
+    last_created = []
+    lock = threading.Lock()
+    def create_instance(*args, **kwargs):
+        with lock:
+            if last_created and last_created[0][:2] == (args, kwargs):
+                return last_created[0][2]
+            instance = cls(*args, **kwargs)
+            last_created[:] = [(args, kwargs, instance)]
+            return instance
+    return create_instance
+'''
+
+
+class _ModuleWriter:
+    def __init__(self):
+        self._imports = {} # module name -> alias
+        self._from_imports = {} # (module name, name) -> alias
+        self._body = []
+        self._counter = itertools.count()
+
+    def new_name(self, prefix: str):
+        return f'_{prefix}{next(self._counter)}'
+
+    def write(self, *lines: str):
+        self._body.extend(lines)
+
+    def import_from(self, module: str, name: str) -> str:
+        key = (module, name)
+        if key not in self._from_imports:
+            self._from_imports[key] = name if name[:1] == '_' else '_' + name
+        return self._from_imports[key]
+
+    def ref(self, obj) -> str:
+        'get a expression which import the `obj` from its module.'
+        if isinstance(obj, Enum):
+            return f'{self.ref(type(obj))}[{obj.name!r}]'
+
+        module = getattr(obj, '__module__', None)
+        qualname = getattr(obj, '__qualname__', None)
+        if module == 'builtins' and getattr(builtins, qualname or '', None) is obj:
+            return qualname
+        if not module or not qualname or '<locals>' in qualname:
+            raise ValueError(f'unable to compile {obj!r}, it is not importable')
+
+        resolved = importlib.import_module(module)
+        for part in qualname.split('.'):
+            resolved = getattr(resolved, part, None)
+        if resolved is not obj:
+            raise ValueError(f'unable to compile {obj!r}, {module}:{qualname} is a different object')
+
+        if module not in self._imports:
+            self._imports[module] = f'_m{len(self._imports)}'
+        return f'{self._imports[module]}.{qualname}'
+
+    def value(self, obj) -> str:
+        'get a expression which build the `obj`.'
+        if obj is None or isinstance(obj, (bool, int, str, bytes)):
+            return repr(obj)
+        if isinstance(obj, float):
+            return repr(obj) if obj == obj and obj not in (float('inf'), float('-inf')) else f'float({str(obj)!r})'
+        if isinstance(obj, tuple):
+            return '(' + ''.join(self.value(x) + ', ' for x in obj) + ')'
+        if isinstance(obj, list):
+            return '[' + ', '.join(self.value(x) for x in obj) + ']'
+        if isinstance(obj, dict):
+            return '{' + ', '.join(f'{self.value(k)}: {self.value(v)}' for k, v in obj.items()) + '}'
+        return self.ref(obj)
+
+    def getvalue(self) -> str:
+        lines = [
+            '# -*- coding: utf-8 -*-',
+            '# generated by click_anno.compile, do not edit.',
+            '',
+            'import click',
+        ]
+        for module, alias in self._imports.items():
+            lines.append(f'import {module} as {alias}')
+        for (module, name), alias in self._from_imports.items():
+            lines.append(f'from {module} import {name} as {alias}' if alias != name else f'from {module} import {name}')
+        lines.append('')
+        lines.append(_PRELUDE)
+        lines.extend(self._body)
+        lines.append('')
+        return '\n'.join(lines)
+
+
+class _Compiler:
+    def __init__(self):
+        self._writer = _ModuleWriter()
+        self._argument_cls = None
+
+    def _get_argument_cls(self):
+        if self._argument_cls is None:
+            self._argument_cls = '_Argument'
+            self._writer.write(inspect.getsource(_Argument))
+        return self._argument_cls
+
+    def _annotation_expr(self, func_expr: str, adapter: ArgumentAdapter) -> str:
+        try:
+            return self._writer.value(adapter._parameter_annotation)
+        except ValueError:
+            # e.g. `array('d')` or `find(A)`
+            return f'{func_expr}.__annotations__[{adapter._parameter_name!r}]'
+
+    def _attr_expr(self, func_expr: str, adapter: ArgumentAdapter, key: str, value) -> str:
+        writer = self._writer
+        annotation = adapter._parameter_annotation
+
+        if key == 'type':
+            if isinstance(value, _EnumChoice):
+                return f'{writer.import_from("click_anno.types", "_EnumChoice")}({writer.ref(value._enum)})'
+            if isinstance(value, _HashedChoice):
+                args = ''.join(writer.value(x) + ', ' for x in value.values)
+                return (f'{writer.import_from("click_anno.types", "choice")}({args}'
+                        f'case_sensitive={value.case_sensitive!r}, prefix={value.prefix!r})')
+            if value is not annotation and value is get_param_type(annotation):
+                get_param_type_expr = writer.import_from('click_anno.types', 'get_param_type')
+                return f'{get_param_type_expr}({self._annotation_expr(func_expr, adapter)})'
+
+        elif key == 'callback':
+            if isinstance(value, _ArrayConverter):
+                factory = writer.import_from('click_anno.types', 'get_array_converter')
+                return f'{factory}({self._annotation_expr(func_expr, adapter)})'
+            if isinstance(value, _StreamReader):
+                factory = writer.import_from('click_anno.types', 'get_stream_reader')
+                return f'{factory}({self._annotation_expr(func_expr, adapter)})'
+
+        elif key == 'default':
+            try:
+                return writer.value(value)
+            except ValueError:
+                raise ValueError(f'unable to compile the default value {value!r} of parameter '
+                                 f'{adapter._parameter_name!r}, it is neither a literal nor importable') from None
+
+        return writer.value(value)
+
+    def _write_params(self, func_expr: str, adapters: list):
+        '''
+        return `(decorators, args)`,
+        `args` are the expressions of arguments for call the function.
+        '''
+        context_injector = get_injector(click.Context)
+        decorators = []
+        args = []
+        for adapter in adapters:
+            if getattr(adapter, 'field_adapters', None) is not None:
+                raise ValueError(f'parameter object {adapter._parameter_name!r} is unable to compile')
+            builder: ClickParameterBuilder = adapter._builder
+            kind = adapter._parameter_kind
+
+            if builder is None:
+                if adapter._injector is context_injector:
+                    value_expr = 'click.get_current_context()'
+                else:
+                    injector_name = self._writer.new_name('inj')
+                    get_injector_expr = self._writer.import_from('click_anno.injectors', 'get_injector')
+                    self._writer.write(
+                        f'{injector_name} = {get_injector_expr}({self._annotation_expr(func_expr, adapter)})')
+                    value_expr = f'{injector_name}.resolve()'
+            else:
+                attrs = builder.attrs.copy()
+                if builder.ptype == ClickParameterBuilder.TYPE_ARGUMENT:
+                    attrs['cls'] = _Argument
+                parts = [repr(x) for x in builder.decls]
+                for key, value in attrs.items():
+                    if key == 'cls' and value is _Argument:
+                        parts.append(f'cls={self._get_argument_cls()}')
+                    else:
+                        parts.append(f'{key}={self._attr_expr(func_expr, adapter, key, value)}')
+                decorators.append(f'@click.{builder.ptype}({", ".join(parts)})')
+                value_expr = f'kw[{adapter._parameter_key!r}]'
+
+            if kind is inspect.Parameter.KEYWORD_ONLY:
+                args.append(f'{adapter._parameter_name}={value_expr}')
+            elif kind is inspect.Parameter.VAR_POSITIONAL:
+                args.append(f'*{value_expr}')
+            else:
+                args.append(value_expr)
+        return decorators, args
+
+    def _write_command_attrs(self, command: click.BaseCommand, info: BuildInfo) -> str:
+        attrs = dict(info.attrs)
+        attrs['name'] = command.name
+        attrs['help'] = command.help
+        return ', '.join(f'{k}={self._writer.value(v)}' for k, v in attrs.items())
+
+    def _write_decorated(self, decorators: list, body: str):
+        self._writer.write(*decorators, body, '')
+
+    def _check_anno_attrs(self, command: click.BaseCommand, info: BuildInfo):
+        unsupported = set(info.anno_attrs) - _SUPPORTED_ANNO_ATTRS
+        # the options from `click_app(...)` are not in `anno_attrs`.
+        adapter = info.adapter
+        unsupported.update(k for k, attr in _ADAPTER_OPTIONS if getattr(adapter, attr, None) not in (None, False))
+        unsupported.update(k for k in ('plugins', 'config') if getattr(command, k, None) is not None)
+        if unsupported:
+            raise ValueError(f'unable to compile {info.target!r} with attrs {sorted(unsupported)}')
+
+    def compile_command(self, command: click.BaseCommand, owner_expr: str = None) -> str:
+        'write the command, return the name of it.'
+        info = get_build_info(command)
+        if info is None:
+            raise ValueError(f'unable to compile {command!r}, it was not built by click_anno')
+        self._check_anno_attrs(command, info)
+
+        if info.kind == BuildInfo.KIND_GROUP:
+            return self._compile_group(command, info, owner_expr)
+
+        if info.kind == BuildInfo.KIND_COMMAND:
+            func_expr = self._writer.ref(info.target)
+        else:
+            func_expr = f'{owner_expr}.{info.name}'
+        decorators, args = self._write_params(func_expr, info.adapter.args_adapters)
+        if info.kind == BuildInfo.KIND_METHOD and not isinstance(info.target, (staticmethod, classmethod)):
+            args.insert(0, '_get_group_instance(click.get_current_context().parent)')
+
+        name = self._writer.new_name('cmd')
+        call_expr = f'{func_expr}({", ".join(args)})'
+        output = info.adapter._output
+        if output is not None:
+            write_result = self._writer.import_from('click_anno.output', 'write_result')
+            body = (f'def {name}(**kw):\n'
+                    f'    result = {call_expr}\n'
+                    f'    {write_result}(result, {output!r})\n'
+                    f'    return result')
+        else:
+            body = f'def {name}(**kw):\n    return {call_expr}'
+        decorators.insert(0, f'@click.command({self._write_command_attrs(command, info)})')
+        self._write_decorated(decorators, body)
+        return name
+
+    def _compile_group(self, group: click.Group, info: BuildInfo, owner_expr: str = None) -> str:
+        if owner_expr is None:
+            cls_expr = self._writer.ref(info.target)
+        else:
+            cls_expr = f'{owner_expr}.{info.name}'
+        factory_expr = cls_expr
+        if info.anno_attrs.get('reusable', False):
+            factory_expr = self._writer.new_name('factory')
+            self._writer.write(f'{factory_expr} = _reusable({cls_expr})', '')
+
+        decorators, args = self._write_params(cls_expr, info.adapter.args_adapters)
+        name = self._writer.new_name('group')
+        body = f'def {name}(**kw):\n    _set_group_factory(lambda: {factory_expr}({", ".join(args)}))'
+        decorators.insert(0, f'@click.group({self._write_command_attrs(group, info)})')
+        self._write_decorated(decorators, body)
+
+        for sub_name, sub_command in group.commands.items():
+            if get_build_info(sub_command) is None:
+                # user defined click command
+                attr_name = _find_attr_name(info.target, sub_command)
+                self._writer.write(f'{name}.add_command({cls_expr}.{attr_name}, {sub_name!r})')
+            else:
+                sub_func_name = self.compile_command(sub_command, cls_expr)
+                self._writer.write(f'{name}.add_command({sub_func_name}, {sub_name!r})', '')
+        self._writer.write('')
+        return name
+
+    def compile(self, command: click.BaseCommand) -> str:
+        name = self.compile_command(command)
+        self._writer.write(
+            f'cli = {name}',
+            '',
+            "if __name__ == '__main__':",
+            '    cli()',
+        )
+        return self._writer.getvalue()
+
+
+def _find_attr_name(cls: type, value):
+    for name in dir(cls):
+        if getattr(cls, name, None) is value:
+            return name
+    raise ValueError(f'unable to find {value!r} from {cls!r}')
+
+
+def _build(target, **options) -> click.BaseCommand:
+    if isinstance(target, click.BaseCommand):
+        return target
+    if isinstance(target, type):
+        return click_app(target, **options)
+    return command(target)
+
+
+def _iter_commands(command: click.BaseCommand, ctx: click.Context):
+    yield ctx
+    for name, sub_command in getattr(command, 'commands', {}).items():
+        yield from _iter_commands(sub_command, click.Context(sub_command, info_name=name, parent=ctx))
+
+def _get_param_info(param: click.Parameter):
+    return (
+        param.param_type_name, param.name, param.opts, param.secondary_opts,
+        param.nargs, param.required, param.multiple, param.default,
+        param.type.name, getattr(param.type, 'choices', None), param.callback is None,
+        getattr(param, 'is_flag', None), getattr(param, 'hidden', None), getattr(param, 'show_default', None),
+    )
+
+def verify(dynamic: click.BaseCommand, compiled: click.BaseCommand):
+    '''
+    check the compiled command has the same help and parameters with the dynamic one,
+    raise `ValueError` if they are different.
+    '''
+    def make_ctx(command):
+        return click.Context(command, info_name=command.name, terminal_width=80, max_content_width=80)
+
+    dynamic_ctxs = list(_iter_commands(dynamic, make_ctx(dynamic)))
+    compiled_ctxs = list(_iter_commands(compiled, make_ctx(compiled)))
+    if [x.command_path for x in dynamic_ctxs] != [x.command_path for x in compiled_ctxs]:
+        raise ValueError('compiled commands are different from the dynamic commands')
+
+    for dynamic_ctx, compiled_ctx in zip(dynamic_ctxs, compiled_ctxs):
+        path = dynamic_ctx.command_path
+        # same as the output of `--help`
+        dynamic_help = dynamic_ctx.get_help()
+        compiled_help = compiled_ctx.get_help()
+        if dynamic_help != compiled_help:
+            diff = '\n'.join(difflib.unified_diff(
+                dynamic_help.splitlines(), compiled_help.splitlines(), 'dynamic', 'compiled', lineterm=''))
+            raise ValueError(f'--help of compiled command {path!r} is different:\n{diff}')
+        dynamic_params = [_get_param_info(x) for x in dynamic_ctx.command.params]
+        compiled_params = [_get_param_info(x) for x in compiled_ctx.command.params]
+        if dynamic_params != compiled_params:
+            raise ValueError(f'parameters of compiled command {path!r} are different')
+
+
+def compile_source(target, verify_result: bool = True, **options) -> str:
+    '''
+    compile `target` as the source code of a plain click module,
+    the module will contains a `cli` object.
+
+    `target` can be:
+
+    - a class, which will be built via `click_app(target, **options)`;
+    - a function, which will be built via `command(target)`;
+    - a `click.BaseCommand` which was built by click_anno.
+
+    the class or function must be importable from its module.
+
+    if `verify_result` is true, the compiled module is executed and each command of it
+    must have the same `--help` output and parameters with the dynamic one, see `verify()`.
+    '''
+    dynamic = _build(target, **options)
+    source = _Compiler().compile(dynamic)
+
+    if verify_result:
+        namespace = {'__name__': '__click_anno_compiled__'}
+        exec(compile(source, '<click_anno.compile>', 'exec'), namespace)
+        verify(dynamic, namespace['cli'])
+
+    return source
+
+
+@command
+def main(target, *, output: str = None, no_verify: flag = False):
+    '''
+    compile TARGET (`module:attr`) as a plain click module.
+    '''
+    source = compile_source(load_target(target), verify_result=not no_verify)
+    if output is None:
+        click.echo(source, nl=False)
+    else:
+        with open(output, 'w', encoding='utf-8') as fp:
+            fp.write(source)
+
+
+if __name__ == '__main__':
+    main(prog_name='python -m click_anno.compile')
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+'''
+load the `default_map` of click from config files, e.g. `click_app(config=[...])`.
+
+the sections are the formatted names of the subcommands:
+
+``` toml
+verbose = true # option of the root group
+
+[remote.add] # command `remote add`
+fetch = true
+```
+
+for ini files, the section is the command path with the name of the root group, e.g. `[app.remote.add]`.
+
+each file is parsed only if the path, the mtime or the size was changed,
+and the merged result is reused until any of the files was changed.
+the merged result is also stored on disk, so the next process does not parse the files again,
+it is keyed by the path, the mtime and the size of each file and the module of the app.
+'''
+
+import os
+import sys
+import threading
+
+import click
+
+FORMAT_JSON = 'json'
+FORMAT_TOML = 'toml'
+FORMAT_INI = 'ini'
+
+_FORMATS_BY_EXT = {
+    '.json': FORMAT_JSON,
+    '.toml': FORMAT_TOML,
+    '.ini': FORMAT_INI,
+    '.cfg': FORMAT_INI,
+    '.conf': FORMAT_INI,
+}
+
+
+class ConfigError(click.ClickException):
+    def __init__(self, path: str, message: str):
+        super().__init__(f'invalid config {path}: {message}')
+        self.path = path
+
+
+def _parse_json(path: str) -> dict:
+    import json
+    with open(path, encoding='utf-8') as fp:
+        return json.load(fp)
+
+def _parse_toml(path: str) -> dict:
+    try:
+        import tomllib # python 3.11+
+    except ImportError:
+        try:
+            import tomli as tomllib
+        except ImportError:
+            raise ConfigError(path, 'parse toml requires python 3.11+ or `tomli`') from None
+    with open(path, 'rb') as fp:
+        return tomllib.load(fp)
+
+def _parse_ini(path: str) -> dict:
+    import configparser
+    parser = configparser.ConfigParser(interpolation=None)
+    with open(path, encoding='utf-8') as fp:
+        parser.read_file(fp)
+    return {name: dict(parser.items(name, raw=True)) for name in parser.sections()}
+
+_PARSERS = {
+    FORMAT_JSON: _parse_json,
+    FORMAT_TOML: _parse_toml,
+    FORMAT_INI: _parse_ini,
+}
+
+
+def _get_default_directory():
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'click_anno', 'config')
+
+def get_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        return _FORMATS_BY_EXT[ext]
+    except KeyError:
+        raise ValueError(f'unknown format of config {path!r}, '
+                         f'the extension must be one of {sorted(_FORMATS_BY_EXT)}') from None
+
+def _stat(path: str):
+    'get the state of the file, `None` if it does not exist.'
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+_PARSED = {} # path -> (state, data)
+_PARSED_LOCK = threading.Lock()
+
+def load_file(path: str, state: tuple = None) -> dict:
+    '''
+    parse the config file, return `None` if the file does not exist.
+
+    the result is cached by the path, the mtime and the size of the file, so do not modify it.
+    '''
+    if state is None:
+        state = _stat(path)
+        if state is None:
+            return None
+    cached = _PARSED.get(path)
+    if cached is not None and cached[0] == state:
+        return cached[1]
+
+    try:
+        data = _PARSERS[get_format(path)](path)
+    except ConfigError:
+        raise
+    except Exception as e:
+        raise ConfigError(path, str(e)) from None
+    if not isinstance(data, dict):
+        raise ConfigError(path, 'the root must be a table')
+    with _PARSED_LOCK:
+        _PARSED[path] = (state, data)
+    return data
+
+
+def merge(base: dict, override: dict) -> dict:
+    'merge the sections of `override` into `base` recursively, return a new dict.'
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            value = merge(merged[key], value)
+        merged[key] = value
+    return merged
+
+
+def _nest_ini_sections(sections: dict, root_name: str) -> dict:
+    'convert the sections like `app.remote.add` into the nested dict, ignore other sections.'
+    nested = {}
+    for name, values in sections.items():
+        parts = name.split('.')
+        if parts[0] != root_name:
+            continue # the file may be shared with other tools
+        node = nested
+        for part in parts[1:]:
+            node = node.setdefault(part, {})
+        node.update(values)
+    return nested
+
+def _get_param_names(cmd: click.BaseCommand) -> dict:
+    'get the map `key in config -> param name`.'
+    names = {}
+    for param in cmd.params:
+        if not param.name or not param.expose_value:
+            continue
+        names[param.name] = names[param.name.replace('_', '-')] = param.name
+        for opt in param.opts + param.secondary_opts:
+            names.setdefault(opt.lstrip('-'), param.name)
+    return names
+
+def _get_app_state(cmd: click.BaseCommand):
+    'get the state of the module which defined the app, the validated result depends on it.'
+    from .core import get_build_info
+
+    info = get_build_info(cmd)
+    module = sys.modules.get(getattr(info.target, '__module__', None)) if info is not None else None
+    path = getattr(module, '__file__', None)
+    return (path, _stat(path)) if path else None
+
+def _validate(cmd: click.BaseCommand, data: dict, path: str, command_path: str) -> dict:
+    'map the keys of `data` to the params and the subcommands of `cmd`.'
+    param_names = _get_param_names(cmd)
+    commands = getattr(cmd, 'commands', {})
+    plugins = getattr(cmd, 'plugins', None)
+    default_map = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            sub_cmd = commands.get(key)
+            if sub_cmd is not None:
+                default_map[key] = _validate(sub_cmd, value, path, f'{command_path} {key}')
+                continue
+            if plugins is not None and key in plugins.get_entries():
+                default_map[key] = value # do not import the plugin
+                continue
+            if key not in param_names:
+                raise ConfigError(path, f'unknown command {command_path} {key}')
+        try:
+            default_map[param_names[key]] = value
+        except KeyError:
+            raise ConfigError(path, f'unknown option {key!r} of {command_path}') from None
+    return default_map
+
+
+class ConfigLoader:
+    '''
+    load the `default_map` from the layered config files, e.g. system, user and project.
+
+    the latter file override the former one, the missing files are ignored.
+
+    the merged `default_map` is cached in memory and in `directory` on disk.
+    '''
+
+    def __init__(self, *paths: str, directory: str = None):
+        self.paths = tuple(os.path.abspath(os.path.expandvars(os.path.expanduser(x))) for x in paths)
+        for path in self.paths:
+            get_format(path) # check the format early
+        self.directory = directory or _get_default_directory()
+        self._cached = None # (group, states, default map)
+
+    def _get_path(self, cmd: click.BaseCommand) -> str:
+        import hashlib
+
+        name = hashlib.sha256(repr((cmd.name, self.paths)).encode()).hexdigest()[:32]
+        return os.path.join(self.directory, name + '.json')
+
+    def _load_stored(self, path: str, key: list):
+        import json
+
+        try:
+            with open(path, encoding='utf-8') as fp:
+                data = json.load(fp)
+        except (OSError, ValueError):
+            return None
+        if data.get('key') != key:
+            return None
+        return data['default_map']
+
+    def _store(self, path: str, key: list, default_map: dict):
+        import json
+        import tempfile
+
+        try:
+            content = json.dumps({'key': key, 'default_map': default_map})
+        except (TypeError, ValueError): # e.g. the datetime of toml
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as fp:
+                fp.write(content)
+            os.replace(tmp_path, path)
+        except OSError: # the cache is optional
+            pass
+
+    def get_default_map(self, cmd: click.BaseCommand) -> dict:
+        '''
+        get the `default_map` for the root command `cmd`.
+        '''
+        states = tuple(_stat(x) for x in self.paths)
+        cached = self._cached
+        if cached is not None and cached[0] is cmd and cached[1] == states:
+            return cached[2]
+
+        # same as the json, the states are lists
+        key = [sys.version, [[p, list(s) if s else None] for p, s in zip(self.paths, states)]]
+        app_state = _get_app_state(cmd)
+        key.append([app_state[0], list(app_state[1]) if app_state[1] else None] if app_state else None)
+        stored_path = self._get_path(cmd)
+        default_map = self._load_stored(stored_path, key)
+
+        if default_map is None:
+            default_map = {}
+            for path, state in zip(self.paths, states):
+                if state is None:
+                    continue
+                data = load_file(path, state)
+                if get_format(path) == FORMAT_INI:
+                    data = _nest_ini_sections(data, cmd.name)
+                default_map = merge(default_map, _validate(cmd, data, path, cmd.name))
+            self._store(stored_path, key, default_map)
+
+        self._cached = (cmd, states, default_map)
+        return default_map
@@ -5,18 +5,28 @@
 #
 # ----------
 
+# annotations are not evaluated, so `typing` is not imported at runtime.
+from __future__ import annotations
+
+import sys
+import time
 import inspect
-import typing
+import threading
 import functools
 import itertools
+from types import SimpleNamespace
 
 import click
 import click.utils
 
-from .injectors import Injector, get_injector
+from . import instrument
+from .injectors import Injector, get_injector, set_exception
 from .snake_case import convert as sc_convert
-from .types import flag, Enum, _EnumChoice, get_param_type
-from .utils import get_attrs
+from .types import (
+    flag, lazy_default, Enum, _EnumChoice,
+    get_param_type, get_params_type, get_choice_type, get_array_converter, get_stream_reader, _StreamReader,
+)
+from .utils import get_attrs, split_attrs
 
 
 class _Argument(click.Argument):
@@ -31,10 +41,134 @@ class _Argument(click.Argument):
         if self.show_default:
             if var.startswith('[') and var.endswith(']'):
                 var = var[1:-1]
-                var = '[%s=%s]' % (var, self.default)
+                default = self.show_default if isinstance(self.show_default, str) else self.default
+                var = '[%s=%s]' % (var, default)
         return var
 
 
+class _HelpEntry:
+    __slots__ = ('hidden', 'help', 'short_help', '_cache')
+
+    def __init__(self, help: str, short_help: str = None, hidden: bool = False):
+        self.help = help
+        self.short_help = short_help
+        self.hidden = hidden
+        self._cache = {} # limit -> short help
+
+    def get_short_help_str(self, limit: int) -> str:
+        try:
+            return self._cache[limit]
+        except KeyError:
+            value = self._cache[limit] = (
+                self.short_help or self.help and click.utils.make_default_short_help(self.help, limit) or ''
+            )
+            return value
+
+
+class _Group(click.Group):
+    '''
+    the group which cache the help of subcommands when they are added,
+    so format help does not need to touch each subcommand.
+
+    use `--help PREFIX` (at the end) to list the subcommands which starts with `PREFIX` only.
+    '''
+    _KEY_HELP_PREFIX = 'click_anno.help_prefix'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.help_entries = {} # name -> _HelpEntry
+        self.plugins = None # the `click_anno.plugins.PluginIndex` of the lazily loaded subcommands
+        self.subcommand_defaults = None # the default anno attrs for the subcommands (and the plugins)
+        self.config = None # the `click_anno.config.ConfigLoader` of the root group
+
+    def add_command(self, cmd, name=None):
+        super().add_command(cmd, name)
+        name = name or cmd.name
+        self.help_entries[name] = _HelpEntry(
+            getattr(cmd, 'help', None),
+            getattr(cmd, 'short_help', None),
+            getattr(cmd, 'hidden', False))
+
+    def list_commands(self, ctx):
+        if self.plugins is None:
+            return super().list_commands(ctx)
+        return sorted(set(self.commands).union(self.plugins.get_entries()))
+
+    def get_command(self, ctx, name):
+        cmd = super().get_command(ctx, name)
+        if cmd is None and self.plugins is not None:
+            cmd = self.plugins.load(name, self.subcommand_defaults)
+            if cmd is not None:
+                self.add_command(cmd, name)
+        return cmd
+
+    def get_help_entry(self, ctx, name: str) -> _HelpEntry:
+        entry = self.help_entries.get(name)
+        if entry is None and name not in self.commands and self.plugins is not None:
+            # use the summary from the index, so the plugin is not imported.
+            plugin = self.plugins.get_entries().get(name)
+            if plugin is not None:
+                return _HelpEntry(plugin[1])
+        if entry is None:
+            cmd = self.get_command(ctx, name)
+            if cmd is not None:
+                entry = self.help_entries[name] = _HelpEntry(cmd.help, cmd.short_help, cmd.hidden)
+        return entry
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        if self.config is not None and parent is None and 'default_map' not in extra:
+            from .config import merge
+            default_map = self.config.get_default_map(self)
+            base = self.context_settings.get('default_map')
+            extra['default_map'] = merge(base, default_map) if base else default_map
+        return super().make_context(info_name, args, parent, **extra)
+
+    def invoke(self, ctx):
+        if ctx.parent is None and instrument.is_enabled(ctx):
+            return instrument.run_invocation(ctx, lambda: super(_Group, self).invoke(ctx))
+        return super().invoke(ctx)
+
+    def parse_args(self, ctx, args):
+        if self._is_help_prefix(ctx, args):
+            ctx.meta[self._KEY_HELP_PREFIX] = args[-1]
+            args = args[:-1]
+        return super().parse_args(ctx, args)
+
+    def _is_help_prefix(self, ctx, args) -> bool:
+        'check if `args` ends with `--help PREFIX` and the `--help` is a option of this group.'
+        if len(args) < 2 or args[-2] not in self.get_help_option_names(ctx) or args[-1][:1] == '-':
+            return False
+        if '--' in args:
+            return False
+        # the tokens before `--help` must be consumed by this group, not a subcommand.
+        parser = self.make_parser(ctx)
+        try:
+            _, largs, _ = parser.parse_args(args=list(args[:-2]))
+        except click.UsageError:
+            return False
+        return not largs
+
+    def format_commands(self, ctx, formatter):
+        prefix = ctx.meta.get(self._KEY_HELP_PREFIX)
+        entries = []
+        for name in self.list_commands(ctx):
+            if prefix and not name.startswith(prefix):
+                continue
+            entry = self.get_help_entry(ctx, name)
+            if entry is None or entry.hidden:
+                continue
+            entries.append((name, entry))
+
+        if entries:
+            limit = formatter.width - 6 - max(len(name) for name, _ in entries)
+            rows = [(name, entry.get_short_help_str(limit)) for name, entry in entries]
+            with formatter.section('Commands'):
+                formatter.write_dl(rows)
+        elif prefix:
+            formatter.write_paragraph()
+            formatter.write_text(f'No commands starts with {prefix!r}.')
+
+
 class ClickParameterBuilder:
     __slots__ = ('ptype', 'decls', 'attrs')
 
@@ -71,6 +205,22 @@ class ClickParameterBuilder:
     def set_default(self, value):
         assert self.ptype is not None
 
+        if isinstance(value, lazy_default):
+            # click will call the callable default only when the value is missing.
+            self.attrs.setdefault('type', value.type or str)
+            self.attrs['default'] = value
+            self.attrs['show_default'] = value.placeholder
+            return
+
+        if isinstance(value, (set, frozenset)):
+            # the default is the choices, the value is `None` if it is missing.
+            choice_type = get_choice_type(value)
+            if choice_type is None:
+                raise ValueError('the choices from default can not be empty')
+            self.attrs.setdefault('type', choice_type)
+            self.attrs['default'] = None
+            return
+
         if self.attrs.get('is_flag', False):
             # click is unable to parse flag as bool
             # so keep it has no type.
@@ -112,6 +262,10 @@ class ArgumentAdapter:
         annotation = _UNSET if param.annotation is inspect.Parameter.empty else param.annotation
         if kind is None:
             kind = param.kind
+        params_type = get_params_type(annotation)
+        if params_type is not None and not get_injector(annotation):
+            from .fields import ParamsAdapter
+            return ParamsAdapter(param.name, kind, default, annotation, params_type)
         adapter = cls(param.name, kind, default, annotation)
         return adapter
 
@@ -152,10 +306,10 @@ class ArgumentAdapter:
         self._builder: ClickParameterBuilder = None
 
         if not self._injector:
-            self._builder = ClickParameterBuilder()
             self._init_click_attrs()
 
     def _init_click_attrs(self):
+        self._builder = ClickParameterBuilder()
         kind = self._parameter_kind
         annotation = self._parameter_annotation
         default = self._parameter_default
@@ -191,7 +345,16 @@ class ArgumentAdapter:
         if annotation is _UNSET:
             return
 
-        elif annotation is tuple:
+        values_callback = get_array_converter(annotation) or get_stream_reader(annotation)
+        if values_callback is not None:
+            return self._init_values_callback(values_callback)
+
+        choice_type = get_choice_type(annotation) # `Literal[...]` or `frozenset`
+        if choice_type is not None:
+            self._builder.attrs['type'] = choice_type
+            return
+
+        if annotation is tuple:
             return self._builder.set_nargs(-1)
 
         elif annotation is flag:
@@ -204,7 +367,7 @@ class ArgumentAdapter:
             elif issubclass(annotation, Enum):
                 self._builder.attrs['type'] = _EnumChoice(annotation)
 
-        elif isinstance(annotation, typing._GenericAlias):
+        elif getattr(annotation, '__origin__', None) is not None:
             # for `Tuple[?]`
             if annotation.__origin__ is tuple:
                 args = annotation.__args__
@@ -219,21 +382,43 @@ class ArgumentAdapter:
                     self._builder.set_nargs(len(args))
                     self._builder.attrs['type'] = tuple(args)
             else:
-                raise ValueError('generic type must be typing.Tuple')
+                raise ValueError('generic type must be typing.Tuple or typing.Literal')
 
         self._builder.attrs.setdefault('type', annotation)
 
+    def _init_values_callback(self, callback):
+        '''
+        for the parameter which receive all values as one object, e.g. buffer or stream.
+
+        for var positional, the values are still converted at once by the buffer,
+        then they are passed as `*values`.
+        '''
+        if self._parameter_kind is inspect.Parameter.VAR_POSITIONAL and isinstance(callback, _StreamReader):
+            raise ValueError(\
+                f'param {self._parameter_name} receive the values as a stream, it can not be var positional')
+
+        if self._builder.ptype == ClickParameterBuilder.TYPE_ARGUMENT:
+            self._builder.set_nargs(-1)
+        else:
+            self._builder.attrs['multiple'] = True
+        # keep raw strings, the callback will convert them at once.
+        self._builder.attrs['type'] = str
+        self._builder.attrs['callback'] = callback
+
     def get_click_decorator(self):
         if self._builder:
             return self._builder.get_decorator()
 
+    def get_value(self, kwargs: dict):
+        'get the value from the injector or the values from click.'
+        if self._injector:
+            return self._injector.resolve()
+        return kwargs.pop(self._parameter_key)
+
     def convert(self, args, kwargs, to_args: list, to_kwargs: dict):
         assert not args
 
-        if self._injector:
-            val = self._injector.get_value()
-        else:
-            val = kwargs.pop(self._parameter_key)
+        val = self.get_value(kwargs)
 
         assert self._parameter_kind is not inspect.Parameter.VAR_KEYWORD
 
@@ -247,13 +432,33 @@ class ArgumentAdapter:
 
 class CallableAdapter:
     @classmethod
-    def from_func(cls, func):
-        adapter = cls(func)
+    def from_func(cls, func, **kwargs):
+        adapter = cls(func, **kwargs)
         adapter.args_adapters.extend(ArgumentAdapter.from_callable(func))
         return adapter
 
-    def __init__(self, func):
+    def __init__(self, func, output: str = None, cache=None, timeout: float = None, memory_budget: int = None,
+                 progress: bool = False, watchdog: float = None):
+        if output is not None:
+            from .output import FORMATS as OUTPUT_FORMATS
+            if output not in OUTPUT_FORMATS:
+                raise ValueError(f'output must be one of {OUTPUT_FORMATS}, not {output!r}')
+        if watchdog is not None and not watchdog > 0:
+            raise ValueError(f'watchdog must be a positive number of seconds, not {watchdog!r}')
+        if cache is not None and cache is not False:
+            from .cache import get_result_cache
+            cache = get_result_cache(cache)
+        else:
+            cache = None
+
         self._func = func
+        self._output = output
+        self._cache = cache
+        self._timeout = timeout
+        self._memory_budget = memory_budget
+        self._progress = progress
+        self._progress_keys = None
+        self._watchdog = watchdog
         self.args_adapters = []
 
         # clone func info
@@ -261,22 +466,177 @@ class CallableAdapter:
         self.__doc__ = func.__doc__
 
     def __call__(self, *args, **kwargs):
-        to_args = []
-        to_kwargs = {}
-        for adapter in self.args_adapters:
-            adapter.convert(args, kwargs, to_args, to_kwargs)
-        return self._func(*to_args, **to_kwargs)
+        ctx = click.get_current_context(silent=True)
+        if ctx is not None and (self._memory_budget is not None or instrument.is_enabled(ctx)):
+            return instrument.run_command(ctx, functools.partial(self._call, args, kwargs), self._memory_budget)
+        return self._call(args, kwargs)
+
+    def _call(self, args, kwargs):
+        invoke = functools.partial(self._invoke, args, kwargs)
+
+        timeout = None
+        if self._timeout is not None:
+            from .cancellation import TIMEOUT_PARAM_NAME
+            timeout = kwargs.pop(TIMEOUT_PARAM_NAME, self._timeout)
+
+        if self._cache is not None:
+            from .cache import NO_CACHE_PARAM_NAME
+            if not kwargs.pop(NO_CACHE_PARAM_NAME, False):
+                identity = f'{self._func.__module__}:{self._func.__qualname__}'
+                invoke = functools.partial(self._cache.invoke, invoke, identity, kwargs.copy())
+
+        if self._watchdog is not None:
+            from .watchdog import run_watched
+            ctx = click.get_current_context(silent=True)
+            command_path = ctx.command_path if ctx is not None else self.__name__
+            invoke = functools.partial(run_watched, invoke, self._watchdog, command_path)
+
+        if timeout is not None and timeout > 0:
+            from .cancellation import run_with_timeout
+            return run_with_timeout(invoke, timeout)
+        return invoke()
+
+    def _invoke(self, args, kwargs):
+        progress = self._start_progress(kwargs) if self._progress else None
+        try:
+            to_args = []
+            to_kwargs = {}
+            for adapter in self.args_adapters:
+                adapter.convert(args, kwargs, to_args, to_kwargs)
+            instrument.mark('injected')
+            result = self._func(*to_args, **to_kwargs)
+            if inspect.iscoroutine(result): # async command
+                from .cancellation import run_coroutine
+                result = run_coroutine(result)
+            if self._output is not None:
+                from .output import write_result
+                write_result(result, self._output)
+            return result
+        except BaseException as e:
+            ctx = click.get_current_context(silent=True)
+            if ctx is not None:
+                set_exception(ctx, e)
+            raise
+        finally:
+            if progress is not None:
+                progress.close()
+
+    def _get_progress_keys(self) -> list:
+        'get the keys of the files and the streams.'
+        if self._progress_keys is None:
+            from .types import _StreamReader
+            keys = []
+            for adapter in self.args_adapters:
+                builder = adapter._builder
+                if builder is None:
+                    continue
+                if isinstance(builder.attrs.get('callback'), _StreamReader) or \
+                        isinstance(builder.attrs.get('type'), click.File):
+                    keys.append(adapter._parameter_key)
+            self._progress_keys = keys
+        return self._progress_keys
+
+    def _start_progress(self, kwargs: dict):
+        keys = [x for x in self._get_progress_keys() if kwargs.get(x) is not None]
+        if not keys:
+            return None
+        from .progress import Progress
+        ctx = click.get_current_context(silent=True)
+        progress = Progress(ctx.command_path if ctx is not None else self.__name__)
+        for key in keys:
+            kwargs[key] = progress.wrap(key, kwargs[key])
+        progress.start()
+        return progress
 
     def get_wrapped_func(self):
         func = self
+        if self._timeout is not None:
+            from .cancellation import TIMEOUT_PARAM_NAME
+            func = click.option('--timeout', TIMEOUT_PARAM_NAME, type=float, default=self._timeout,
+                show_default=True, metavar='SECONDS',
+                help='Cancel the command after SECONDS, 0 for no timeout.')(func)
+        if self._cache is not None:
+            from .cache import NO_CACHE_PARAM_NAME
+            func = click.option('--no-cache', NO_CACHE_PARAM_NAME, is_flag=True,
+                help='Run the command without the cached result.')(func)
         for adapter in reversed(self.args_adapters):
             decorator = adapter.get_click_decorator()
             if decorator:
                 func = decorator(func)
         return func
 
+    # the anno attrs which are the kwargs of `CallableAdapter`
+    OPTION_KEYS = ('output', 'cache', 'timeout', 'memory_budget', 'progress', 'watchdog')
+
+    @classmethod
+    def get_options(cls, anno_attrs: dict, defaults=None) -> dict:
+        '''
+        get the kwargs of `CallableAdapter` from `anno_attrs`,
+        use the attrs from `defaults` if missing.
+        '''
+        kwargs = {}
+        for key in cls.OPTION_KEYS:
+            value = anno_attrs.get(key, getattr(defaults, key, None))
+            if value is not None:
+                kwargs[key] = value
+        return kwargs
+
+
+class BuildInfo:
+    '''
+    record how a `click.BaseCommand` was built by click_anno.
+    '''
+    KIND_COMMAND = 'command' # from a function
+    KIND_METHOD = 'method' # from a member of a group class
+    KIND_GROUP = 'group' # from a class
+
+    __slots__ = ('kind', 'target', 'name', 'owner', 'adapter', 'attrs', 'anno_attrs', 'rebuild',
+                 'build_time', 'build_memory')
+
+    def __init__(self, kind: str, target, adapter: CallableAdapter, attrs: dict, anno_attrs: dict,
+                 name: str = None, owner: type = None):
+        self.kind = kind
+        self.target = target # the function or the class
+        self.name = name # the attr name in the `owner`
+        self.owner = owner # the class which contains the `target`
+        self.adapter = adapter
+        self.attrs = attrs
+        self.anno_attrs = anno_attrs
+        self.rebuild = None # for group, a function `(new_cls, reuse=None)` which rebuild the group from a new class
+        self.build_time = None # seconds, include the subcommands
+        self.build_memory = None # retained bytes, include the subcommands, only if tracemalloc is tracing
+
+    def attach(self, command: click.BaseCommand):
+        setattr(command, _KEY_BUILD_INFO, self)
+        return command
+
+    @staticmethod
+    def start_measure():
+        'return a mark for `set_cost()`.'
+        memory = None
+        tracemalloc = sys.modules.get('tracemalloc') # do not import it
+        if tracemalloc is not None and tracemalloc.is_tracing():
+            memory = tracemalloc.get_traced_memory()[0]
+        return time.perf_counter(), memory
+
+    def set_cost(self, mark):
+        'record the cost since `start_measure()`.'
+        start_time, start_memory = mark
+        self.build_time = time.perf_counter() - start_time
+        if start_memory is not None:
+            self.build_memory = sys.modules['tracemalloc'].get_traced_memory()[0] - start_memory
+
+_KEY_BUILD_INFO = '__click_anno_build_info__'
+
+def get_build_info(command: click.BaseCommand) -> BuildInfo:
+    '''
+    get the `BuildInfo` of the `command`,
+    return `None` if the `command` was not built by click_anno.
+    '''
+    return getattr(command, _KEY_BUILD_INFO, None)
 
-def anno(func=None) -> typing.Callable:
+
+def anno(func=None):
     '''
     convert all annotations as click decorators to decorate the `func`,
     return the decorated function.
@@ -305,29 +665,82 @@ def command(func) -> click.Command:
     '''
     build a `function` as a `click.Command`.
     '''
-    wrapped_func = anno(func)
-    attrs = get_attrs(func, False)
-    return click.command(**attrs)(wrapped_func)
-
+    return _make_command(func)
+
+def _make_command(func, defaults=None) -> click.Command:
+    'build a `function` as a `click.Command`, use the anno attrs from `defaults` if missing.'
+    mark = BuildInfo.start_measure()
+    attrs, anno_attrs = split_attrs(get_attrs(func, False))
+    adapter = CallableAdapter.from_func(func, **CallableAdapter.get_options(anno_attrs, defaults))
+    info = BuildInfo(BuildInfo.KIND_COMMAND, func, adapter, attrs, anno_attrs)
+    built = click.command(**_get_command_attrs(attrs, anno_attrs, defaults))(adapter.get_wrapped_func())
+    info.attach(built)
+    info.set_cost(mark)
+    return built
+
+
+def _get_command_attrs(attrs: dict, anno_attrs: dict, defaults=None) -> dict:
+    'get the attrs for `click.command()`, use the attrs from `defaults` if missing.'
+    if anno_attrs.get('fast_parse', getattr(defaults, 'fast_parse', None)) and 'cls' not in attrs:
+        from .fastparse import FastCommand
+        return dict(attrs, cls=FastCommand)
+    return attrs
+
+
+def _create_init_wrapper(cls, reusable: bool = False):
+    # for reusable class, keep the last instance as `(args, kwargs, instance)`
+    last_created = []
+    # the invocations may run on multi threads (e.g. server mode)
+    lock = threading.Lock()
+
+    def create_instance(args, kwargs):
+        if reusable:
+            with lock:
+                if last_created and last_created[0][:2] == (args, kwargs):
+                    return last_created[0][2]
+                instance = cls(*args, **kwargs)
+                last_created[:] = [(args, kwargs, instance)]
+                return instance
+        return cls(*args, **kwargs)
 
-def _create_init_wrapper(cls):
     @functools.wraps(cls)
     def init_wrapper(*args, **kwargs):
         ctx = click.get_current_context()
-        ctx.__instance = cls(*args, **kwargs)
+        # the instance will be created when a method access it.
+        ctx.__instance_factory = functools.partial(create_instance, args, kwargs)
+        ctx.__instance = _UNSET
+        if ctx.invoked_subcommand is None:
+            # no subcommand will access the instance,
+            # create it now so the `__init__` still get called.
+            _get_group_instance(ctx)
     return init_wrapper
 
+def _get_group_instance(ctx: click.Context):
+    instance = ctx.__instance
+    if instance is _UNSET:
+        instance = ctx.__instance = ctx.__instance_factory()
+    return instance
+
 def _create_method_wrapper(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         ctx = click.get_current_context()
-        instance = ctx.parent.__instance
+        instance = _get_group_instance(ctx.parent)
         return func(instance, *args, **kwargs)
     return wrapper
 
 
 class GroupBuilderOptions:
     allow_inherit = False
+    output = None # default output format for subcommands
+    cache = None # default result cache for subcommands
+    timeout = None # default timeout (in seconds) for subcommands
+    memory_budget = None # default soft memory budget (in bytes) for subcommands
+    plugins = None # the entry point group (or a `PluginIndex`) to mount subcommands from
+    profile_option = False # add the hidden option `--click-anno-profile` to the root group
+    progress = None # report the progress of the files and the streams for subcommands
+    watchdog = None # sample the stacks of subcommands which run longer than the seconds
+    config = None # the config file (or a list of the layered files) to load the `default_map` from
 
     @staticmethod
     def _remove_underline_suffix(name: str):
@@ -364,7 +777,7 @@ class GroupBuilderOptions:
         else:
             return self.command_name_format(command, name)
 
-    def find_origin_name(self, command, names: typing.List[str]) -> str:
+    def find_origin_name(self, command, names: list) -> str:
         '''
         find origin name so we known which is alias, which is not;
         the origin name must in `names`.
@@ -399,7 +812,7 @@ class _SubCommandBuilder:
         self.is_group = is_group
         self.command = command
         self.name = name
-        self.attrs: dict = get_attrs(command)
+        self.attrs, self.anno_attrs = split_attrs(get_attrs(command))
         self.formated_name = formated_name
 
         # set only if user use default value
@@ -415,6 +828,14 @@ class _SubCommandBuilder:
             self.attrs['name'] = self.formated_name
 
 
+def _get_subcommand_defaults(anno_attrs: dict, parent):
+    '''
+    get the default anno attrs for the subcommands of a group,
+    the attrs of the group class override the ones from `parent`.
+    '''
+    keys = CallableAdapter.OPTION_KEYS + ('fast_parse', )
+    return SimpleNamespace(**{k: anno_attrs.get(k, getattr(parent, k, None)) for k in keys})
+
 def click_app(cls: type = None, **kwargs) -> click.Group:
     '''
     build a `class` as a `click.Group`.
@@ -424,18 +845,50 @@ def click_app(cls: type = None, **kwargs) -> click.Group:
     options = GroupBuilderOptions()
     vars(options).update(kwargs)
 
-    def make_group(cls: type, attrs: dict):
-        'make group from a class'
-        adapter = CallableAdapter(_create_init_wrapper(cls))
+    def make_group(cls: type, attrs: dict, anno_attrs: dict, name: str = None, owner: type = None,
+                   parent_defaults=options, reuse=None):
+        '''
+        make group from a class.
+
+        `reuse(cls, attrs, parent_defaults)` can return a built nested group to skip building it.
+        '''
+        mark = BuildInfo.start_measure()
+        defaults = _get_subcommand_defaults(anno_attrs, parent_defaults)
+        adapter = CallableAdapter(_create_init_wrapper(cls, anno_attrs.get('reusable', False)))
         adapter.args_adapters.extend(ArgumentAdapter.from_callable(cls))
-        group = click.group(**attrs)(adapter.get_wrapped_func())
+        group = click.group(**{'cls': _Group, **attrs})(adapter.get_wrapped_func())
+        group.subcommand_defaults = defaults
+        if owner is None and options.profile_option:
+            group.params.append(instrument.make_profile_option())
+        if owner is None and options.plugins:
+            from .plugins import PluginIndex
+            plugins = options.plugins
+            group.plugins = PluginIndex(plugins) if isinstance(plugins, str) else plugins
+        if owner is None and options.config:
+            from .config import ConfigLoader
+            config = options.config
+            if isinstance(config, str):
+                config = ConfigLoader(config)
+            elif not isinstance(config, ConfigLoader):
+                config = ConfigLoader(*config)
+            group.config = config
+        info = BuildInfo(BuildInfo.KIND_GROUP, cls, adapter, attrs, anno_attrs, name, owner)
+        info.attach(group)
+
+        def rebuild(new_cls: type, reuse=None):
+            new_attrs, new_anno_attrs = split_attrs(get_attrs(new_cls))
+            for key in ('name', 'hidden'): # decided by the parent group
+                if key in attrs:
+                    new_attrs.setdefault(key, attrs[key])
+            return make_group(new_cls, new_attrs, new_anno_attrs, name, owner, parent_defaults, reuse)
+        info.rebuild = rebuild
 
         # list subcommands
         user_commands = []
         map_by_cmd = {}
-        for name, subcommand in list(options.iter_subcommands(cls)):
+        for attr_name, subcommand in list(options.iter_subcommands(cls)):
             is_group = options.is_group(subcommand)
-            formated_name = options.name_format(is_group, subcommand, name)
+            formated_name = options.name_format(is_group, subcommand, attr_name)
 
             if isinstance(subcommand, click.BaseCommand):
                 user_commands.append((subcommand, formated_name))
@@ -444,7 +897,7 @@ def click_app(cls: type = None, **kwargs) -> click.Group:
                 builder = _SubCommandBuilder(
                     is_group=is_group,
                     command=subcommand,
-                    name=name,
+                    name=attr_name,
                     formated_name=formated_name
                 )
                 user_commands.append(builder)
@@ -453,7 +906,7 @@ def click_app(cls: type = None, **kwargs) -> click.Group:
 
         # prepare attrs, handle alias, etc.
         for subcommand in map_by_cmd:
-            builder_list: typing.List[_SubCommandBuilder] = map_by_cmd[subcommand]
+            builder_list: list = map_by_cmd[subcommand]
             if len(builder_list) > 1: # has alias
                 names = [x.name for x in builder_list]
                 origin_name = options.find_origin_name(subcommand, names)
@@ -478,27 +931,38 @@ def click_app(cls: type = None, **kwargs) -> click.Group:
         for item in user_commands:
             if isinstance(item, _SubCommandBuilder):
                 if item.is_group:
-                    builded_command = make_group(item.command, item.attrs)
+                    builded_command = reuse(item.command, item.attrs, defaults) if reuse is not None else None
+                    if builded_command is None:
+                        builded_command = make_group(item.command, item.attrs, item.anno_attrs, item.name, cls,
+                            defaults, reuse)
                 else:
+                    method_mark = BuildInfo.start_measure()
                     is_objectmethod = not isinstance(item.command, (classmethod, staticmethod))
                     if is_objectmethod:
                         callable_wrapper = _create_method_wrapper(item.command)
                     else:
                         callable_wrapper = item.command
-                    adapter = CallableAdapter(callable_wrapper)
+                    adapter = CallableAdapter(callable_wrapper,
+                        **CallableAdapter.get_options(item.anno_attrs, defaults))
                     adapter.args_adapters.extend(ArgumentAdapter.from_callable(item.command))
                     if is_objectmethod:
                         adapter.args_adapters.pop(0) # remove arg `self`
-                    builded_command = click.command(**item.attrs)(adapter.get_wrapped_func())
+                    builded_command = click.command(**_get_command_attrs(item.attrs, item.anno_attrs, defaults))(
+                        adapter.get_wrapped_func())
+                    method_info = BuildInfo(BuildInfo.KIND_METHOD, item.command, adapter, item.attrs,
+                        item.anno_attrs, item.name, cls)
+                    method_info.attach(builded_command)
+                    method_info.set_cost(method_mark)
                 group.add_command(builded_command)
             else:
                 group.add_command(*item)
 
+        info.set_cost(mark)
         return group
 
     def warpper(cls) -> click.Group:
-        attrs: dict = get_attrs(cls)
+        attrs, anno_attrs = split_attrs(get_attrs(cls))
         attrs.setdefault('name', options.group_name_format(cls, cls.__name__))
-        return make_group(cls, attrs)
+        return make_group(cls, attrs, anno_attrs)
 
     return warpper(cls) if cls else warpper
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+'''
+a fast path to parse the arguments of simple commands.
+
+the fast path only handle the common case,
+it fall back to click for anything it does not support, include all errors,
+so the behavior and the error messages are always same as click.
+'''
+
+import click
+from click import types as click_types
+
+_SIMPLE_TYPES = (
+    click_types.StringParamType,
+    click_types.IntParamType,
+    click_types.FloatParamType,
+    click_types.BoolParamType,
+    click_types.UUIDParameterType,
+    click.Choice,
+)
+
+_MISSING = object()
+
+
+class _Fallback(Exception):
+    pass
+
+
+def _get_converter(param: click.Parameter):
+    param_type = param.type
+    if param_type is click.STRING:
+        return lambda value: value
+    if param_type is click.INT:
+        return int
+    if param_type is click.FLOAT:
+        return float
+    return lambda value: param_type.convert(value, param, None)
+
+
+def _is_simple(param: click.Parameter) -> bool:
+    if param.callback is not None or param.is_eager or param.envvar is not None:
+        return False
+    if param.nargs != 1 or param.multiple or not isinstance(param.type, _SIMPLE_TYPES):
+        return False
+    if isinstance(param, click.Option):
+        return not param.count and param.prompt is None
+    return isinstance(param, click.Argument)
+
+
+class _ParsePlan:
+    '''
+    the tables which built from the parameters of the command.
+    '''
+    __slots__ = ('options', 'arguments', 'prefixes', 'params')
+
+    def __init__(self, params: list):
+        self.options = {} # opt -> (param, const or _MISSING, converter)
+        self.arguments = [] # (param, converter)
+        self.prefixes = {'-'}
+        self.params = params
+        for param in params:
+            converter = _get_converter(param)
+            if isinstance(param, click.Argument):
+                self.arguments.append((param, converter))
+                continue
+            if param.is_flag and param.is_bool_flag and param.secondary_opts:
+                consts = ((param.opts, True), (param.secondary_opts, False))
+            elif param.is_flag:
+                consts = ((param.opts, param.flag_value), )
+            else:
+                consts = ((param.opts, _MISSING), )
+            for opts, const in consts:
+                for opt in opts:
+                    self.options[opt] = (param, const, converter)
+                    self.prefixes.add(opt[:1])
+
+    @classmethod
+    def create(cls, command: click.Command):
+        'return `None` if any parameter is unsupported.'
+        if all(_is_simple(x) for x in command.params):
+            return cls(command.params)
+
+    def parse(self, args: list) -> dict:
+        '''
+        parse `args` into a dict `param -> converted value`, raise `_Fallback` if unable to.
+        '''
+        options = self.options
+        prefixes = self.prefixes
+        values = {}
+        positionals = []
+        i = 0
+        count = len(args)
+        while i < count:
+            arg = args[i]
+            i += 1
+            if arg[:1] not in prefixes or len(arg) == 1:
+                positionals.append(arg)
+                continue
+            if arg == '--':
+                raise _Fallback
+            entry = options.get(arg)
+            if entry is None:
+                name, sep, value = arg.partition('=')
+                entry = options.get(name) if sep and name[:2] == '--' else None
+                if entry is None or entry[1] is not _MISSING:
+                    raise _Fallback # unknown option or flag with value
+            else:
+                param, const, converter = entry
+                if const is not _MISSING:
+                    values[param] = (const, converter)
+                    continue
+                if i == count:
+                    raise _Fallback # missing value
+                value = args[i]
+                i += 1
+            param, _, converter = entry
+            values[param] = (value, converter)
+
+        if len(positionals) > len(self.arguments):
+            raise _Fallback # extra arguments
+        for (param, converter), value in zip(self.arguments, positionals):
+            values[param] = (value, converter)
+
+        try:
+            return {param: converter(value) for param, (value, converter) in values.items()}
+        except Exception:
+            raise _Fallback
+
+
+class FastCommand(click.Command):
+    '''
+    a `click.Command` which try to parse the arguments in one pass before use the parser of click.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._parse_plan = _ParsePlan.create(self)
+
+    def _can_fast_parse(self, ctx: click.Context, args: list) -> bool:
+        return (
+            self._parse_plan is not None and
+            (args or not self.no_args_is_help) and
+            not ctx.resilient_parsing and
+            ctx.default_map is None and
+            ctx.auto_envvar_prefix is None and
+            ctx.token_normalize_func is None and
+            ctx.allow_interspersed_args and
+            not ctx.allow_extra_args and
+            not ctx.ignore_unknown_options
+        )
+
+    def _fast_parse(self, ctx: click.Context, args: list):
+        plan = self._parse_plan
+        values = plan.parse(args)
+        params = {}
+        for param in plan.params:
+            value = values.get(param, _MISSING)
+            if value is _MISSING:
+                try:
+                    value = param.get_default(ctx)
+                except Exception:
+                    raise _Fallback
+                if param.required and param.value_is_missing(value):
+                    raise _Fallback
+            if param.expose_value:
+                params[param.name] = value
+        ctx.params.update(params)
+
+    def parse_args(self, ctx: click.Context, args: list):
+        if self._can_fast_parse(ctx, args):
+            try:
+                self._fast_parse(ctx, args)
+            except _Fallback:
+                pass
+            else:
+                ctx.args = []
+                return []
+        return super().parse_args(ctx, args)
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+'''
+expand the fields of a `dataclass` or a `NamedTuple` parameter into click options.
+'''
+
+import inspect
+import operator
+
+from .core import ArgumentAdapter, _UNSET
+from .types import params
+
+
+class _Field:
+    __slots__ = ('name', 'annotation', 'default', 'has_factory', 'positional')
+
+    def __init__(self, name: str, annotation, default=_UNSET, has_factory: bool = False, positional: bool = True):
+        self.name = name
+        self.annotation = annotation
+        self.default = default
+        self.has_factory = has_factory # the default is from the `default_factory` of dataclass
+        self.positional = positional
+
+
+def _get_type_hints(cls) -> dict:
+    import typing
+    try:
+        return typing.get_type_hints(cls)
+    except Exception: # unable to resolve the forward references
+        return getattr(cls, '__annotations__', {})
+
+def _analyze_dataclass(cls) -> tuple:
+    import dataclasses
+
+    hints = _get_type_hints(cls)
+    fields = []
+    for field in dataclasses.fields(cls):
+        if not field.init:
+            continue
+        default = _UNSET
+        has_factory = False
+        if field.default is not dataclasses.MISSING:
+            default = field.default
+        elif field.default_factory is not dataclasses.MISSING:
+            default = None # the factory is called by `__init__` if the option is missing
+            has_factory = True
+        fields.append(_Field(field.name, hints.get(field.name, field.type), default, has_factory,
+                             positional=not getattr(field, 'kw_only', False)))
+    return tuple(fields)
+
+def _analyze_namedtuple(cls) -> tuple:
+    hints = _get_type_hints(cls)
+    defaults = getattr(cls, '_field_defaults', {})
+    return tuple(_Field(name, hints.get(name, _UNSET), defaults.get(name, _UNSET)) for name in cls._fields)
+
+_FIELDS_CACHE = {}
+
+def get_fields(cls) -> tuple:
+    '''
+    get the fields of the `dataclass` or `NamedTuple`, the result is cached per type.
+    '''
+    fields = _FIELDS_CACHE.get(cls)
+    if fields is None:
+        if hasattr(cls, '__dataclass_fields__'):
+            fields = _analyze_dataclass(cls)
+        else:
+            fields = _analyze_namedtuple(cls)
+        _FIELDS_CACHE[cls] = fields
+    return fields
+
+
+def make_constructor(cls, fields: tuple, keys: list):
+    '''
+    make a function which build `cls` from the values of click by `keys`, at once.
+    '''
+    if len(keys) == 1:
+        key = keys[0]
+        get_values = lambda kwargs: (kwargs[key], )
+    else:
+        get_values = operator.itemgetter(*keys)
+
+    if all(x.positional and not x.has_factory for x in fields):
+        if not hasattr(cls, '__dataclass_fields__'): # NamedTuple
+            new = tuple.__new__
+            return lambda kwargs: new(cls, get_values(kwargs))
+        return lambda kwargs: cls(*get_values(kwargs))
+
+    names = [x.name for x in fields]
+    factory_names = [x.name for x in fields if x.has_factory]
+    def construct(kwargs):
+        values = dict(zip(names, get_values(kwargs)))
+        for name in factory_names:
+            if values[name] is None: # let `__init__` call the factory
+                del values[name]
+        return cls(**values)
+    return construct
+
+
+class ParamsAdapter(ArgumentAdapter):
+    '''
+    the adapter for a parameter object, each field is a keyword only `ArgumentAdapter`.
+    '''
+
+    def __init__(self, param_name: str, param_kind: inspect._ParameterKind, param_def, param_anno,
+                 params_type: params):
+        if param_kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD):
+            raise ValueError(f'param {param_name} is a parameter object, it can not be variadic')
+        if param_def is not _UNSET and not isinstance(param_def, params_type.type):
+            raise ValueError(f'the default of param {param_name} must be a instance of {params_type.type!r}')
+        self._params_type = params_type
+        super().__init__(param_name, param_kind, param_def, param_anno)
+
+    def _init_click_attrs(self):
+        params_type = self._params_type
+        prefix = params_type.prefix
+        if prefix is True:
+            prefix = self._parameter_key
+        fields = get_fields(params_type.type)
+        default = self._parameter_default
+        if default is not _UNSET: # the values of the default instance are the defaults of the options
+            fields = tuple(_Field(x.name, x.annotation, getattr(default, x.name), positional=x.positional)
+                           for x in fields)
+        self.field_adapters = [
+            ArgumentAdapter(
+                f'{prefix}_{x.name}' if prefix else x.name,
+                inspect.Parameter.KEYWORD_ONLY, x.default, x.annotation)
+            for x in fields
+        ]
+        keys = [x._parameter_key for x in self.field_adapters]
+        self._construct = make_constructor(params_type.type, fields, keys)
+
+    def get_click_decorator(self):
+        decorators = [x.get_click_decorator() for x in self.field_adapters]
+        def decorator(func):
+            for item in reversed(decorators):
+                func = item(func)
+            return func
+        return decorator
+
+    def get_value(self, kwargs: dict):
+        return self._construct(kwargs)
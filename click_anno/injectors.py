@@ -6,23 +6,85 @@
 # ----------
 
 import abc
+import types
 
 import click
 
 class Injector(abc.ABC):
     '''
     a argument source from runtime instead of parse from command line.
+
+    `get_value()` may return a generator (or a context manager from `@contextlib.contextmanager`),
+    the value from `yield` will be injected, and the teardown will run when the current `click.Context` closes,
+    with the exception of the command if it failed (the exception can not be suppressed).
     '''
 
+    # set to `True` to enter any context manager, e.g. a file or a `tempfile.TemporaryDirectory`.
+    # it is opt-in, because a shared object (e.g. a singleton connection) must not be closed.
+    enter_context = False
+
     @abc.abstractmethod
     def get_value(self):
         raise NotImplementedError
 
+    def resolve(self):
+        '''
+        get the value to inject.
+        '''
+        value = self.get_value()
+        if isinstance(value, types.GeneratorType):
+            import contextlib
+            value = contextlib.contextmanager(lambda: value)()
+        elif not self.enter_context and not _is_generator_context_manager(value):
+            return value
+        elif not hasattr(value, '__enter__') or not hasattr(value, '__exit__'):
+            return value
+
+        return _get_exit_stack(click.get_current_context()).enter_context(value)
+
+
+def _get_exit_stack(ctx: click.Context):
+    'get the `ExitStack` of `ctx`, which is closed with the exception of the command when `ctx` closes.'
+    stack = getattr(ctx, '_click_anno_exit_stack', None)
+    if stack is None:
+        import contextlib
+        stack = ctx._click_anno_exit_stack = contextlib.ExitStack()
+
+        def close():
+            ctx._click_anno_exit_stack = None
+            exc = getattr(ctx, '_click_anno_exception', None)
+            if exc is None:
+                stack.__exit__(None, None, None)
+            else:
+                stack.__exit__(type(exc), exc, exc.__traceback__)
+        ctx.call_on_close(close)
+    return stack
+
+def set_exception(ctx: click.Context, exc: BaseException):
+    '''
+    record the exception of the command on `ctx` and its parents,
+    so the injected context managers see it on teardown.
+    '''
+    if isinstance(exc, click.exceptions.Exit) and exc.exit_code == 0: # `ctx.exit()`
+        return
+    while ctx is not None:
+        if getattr(ctx, '_click_anno_exception', None) is None:
+            ctx._click_anno_exception = exc
+        ctx = ctx.parent
+
+
+def _is_generator_context_manager(value) -> bool:
+    'check if the `value` is created by `@contextlib.contextmanager`.'
+    import sys
+    contextlib = sys.modules.get('contextlib') # if it was not imported, the value can not be
+    return contextlib is not None and isinstance(value, contextlib._GeneratorContextManager)
+
 
 class _CallableInjector(Injector):
-    def __init__(self, factory):
+    def __init__(self, factory, enter_context: bool = False):
         super().__init__()
         self._factory = factory
+        self.enter_context = enter_context
 
     def get_value(self):
         return self._factory()
@@ -61,6 +123,8 @@ def ensure(object_type: type):
 class Injectable(abc.ABC):
     '''
     the base interface for a injectable type.
+
+    `__inject__()` can be a generator like the factory of `inject()`.
     '''
 
     @classmethod
@@ -78,14 +142,53 @@ class _InjectableInjector(Injector):
 
 _INJECTOR_MAPS = {}
 
-def inject(annotation: type, factory):
+def inject(annotation: type, factory, enter_context: bool = False):
     '''
     declare the type that should be inject by call the `factory` instead of parse from command line.
+
+    the `factory` can be a generator function (or a `@contextlib.contextmanager`),
+    the resource will be released when the current `click.Context` closes.
+    set `enter_context` to `True` to enter any other context manager which returned by the `factory`,
+    otherwise it is injected as is.
     '''
     if not callable(factory):
         raise TypeError
 
-    _INJECTOR_MAPS[annotation] = _CallableInjector(factory)
+    _INJECTOR_MAPS[annotation] = _CallableInjector(factory, enter_context)
+
+
+class _PoolInjector(Injector):
+    def __init__(self, pool):
+        self._pool = pool
+
+    def get_value(self):
+        ctx = click.get_current_context()
+        # reuse the resource for the whole invocation (group and subcommands)
+        key = ('click_anno.pool', id(self._pool))
+        resource = ctx.meta.get(key)
+        if resource is None:
+            resource = ctx.meta[key] = self._pool.acquire()
+
+            def release():
+                del ctx.meta[key]
+                self._pool.release(resource)
+            ctx.find_root().call_on_close(release)
+        return resource
+
+
+def inject_pool(annotation: type, factory, max_size: int = 8, validate=None, idle_timeout: float = None,
+                close=None):
+    '''
+    declare the type that should be inject from a pool of the resources created by the `factory`.
+
+    the resource is reused in the same invocation and returned to the pool when the context closes.
+    return the `click_anno.pool.ResourcePool`.
+    '''
+    from .pool import ResourcePool
+
+    pool = ResourcePool(factory, max_size=max_size, validate=validate, idle_timeout=idle_timeout, close=close)
+    _INJECTOR_MAPS[annotation] = _PoolInjector(pool)
+    return pool
 
 
 def get_injector(annotation: type):
@@ -94,7 +197,7 @@ def get_injector(annotation: type):
 
     try:
         return _INJECTOR_MAPS[annotation]
-    except (KeyError, ValueError):
+    except (KeyError, TypeError): # unable to hash
         pass
 
     if isinstance(annotation, type) and issubclass(annotation, Injectable):
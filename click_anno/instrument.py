@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+'''
+opt-in instrumentation for the commands built by click_anno, without editing the code.
+
+enable it by environment variables:
+
+- `CLICK_ANNO_PROFILE`: `body` (or `1`) to profile the body of each command,
+  `invocation` to profile the whole invocation, include injectors and the `__init__` of groups;
+- `CLICK_ANNO_PROFILE_SAMPLE`: profile one in N invocations;
+- `CLICK_ANNO_PROFILE_MIN_MS`: only keep the profiles which slower than X ms;
+- `CLICK_ANNO_MEMORY`: `1` to report the peak and retained allocations of each command by tracemalloc;
+- `CLICK_ANNO_MEMORY_FRAMES`: the number of frames to trace, 5 by default;
+- `CLICK_ANNO_MEMORY_TOP`: the number of top tracebacks in the report, 10 by default;
+- `CLICK_ANNO_MEMORY_BUDGET`: the default soft memory budget (bytes) of each command,
+  which can be set by `attrs(memory_budget=...)` for a single command;
+- `CLICK_ANNO_MEMORY_BUDGET_ACTION`: `log` (default) or `abort` when the peak exceeds the budget;
+- `CLICK_ANNO_INSTRUMENT_DIR`: the directory of the results, `<tempdir>/click_anno` by default.
+
+or by the hidden option `--click-anno-profile [body|invocation]` which added by `click_app(profile_option=True)`.
+'''
+
+import os
+import time
+import functools
+import itertools
+
+import click
+
+ENV_PROFILE = 'CLICK_ANNO_PROFILE'
+ENV_PROFILE_SAMPLE = 'CLICK_ANNO_PROFILE_SAMPLE'
+ENV_PROFILE_MIN_MS = 'CLICK_ANNO_PROFILE_MIN_MS'
+ENV_MEMORY = 'CLICK_ANNO_MEMORY'
+ENV_MEMORY_FRAMES = 'CLICK_ANNO_MEMORY_FRAMES'
+ENV_MEMORY_TOP = 'CLICK_ANNO_MEMORY_TOP'
+ENV_MEMORY_BUDGET = 'CLICK_ANNO_MEMORY_BUDGET'
+ENV_MEMORY_BUDGET_ACTION = 'CLICK_ANNO_MEMORY_BUDGET_ACTION'
+ENV_DIR = 'CLICK_ANNO_INSTRUMENT_DIR'
+
+SCOPE_BODY = 'body'
+SCOPE_INVOCATION = 'invocation'
+_SCOPES = (SCOPE_BODY, SCOPE_INVOCATION)
+
+_KEY_PROFILE = 'click_anno.profile' # set by the hidden option
+_KEY_COMMAND_PATH = 'click_anno.command_path' # the path of the invoked command
+
+_listeners = []
+_memory_trackers = [] # the stack of the active `_MemoryTracker`
+_invocations = itertools.count(1)
+_results = itertools.count(1)
+
+
+def add_listener(listener):
+    '''
+    add a `listener(event: dict)` to receive the results of the instrumentation,
+    the `event` contains the key `event`, `command` and other data.
+    '''
+    _listeners.append(listener)
+
+def remove_listener(listener):
+    _listeners.remove(listener)
+
+def emit(event: str, command: str, **data):
+    if _listeners:
+        event = dict(data, event=event, command=command)
+        for listener in list(_listeners):
+            listener(event)
+
+
+def get_directory() -> str:
+    directory = os.environ.get(ENV_DIR)
+    if not directory:
+        import tempfile
+        directory = os.path.join(tempfile.gettempdir(), 'click_anno')
+    return directory
+
+def make_result_path(command_path: str, suffix: str) -> str:
+    '''
+    make the path of the result file, named by the command path and the timestamp.
+    '''
+    name = ''.join(c if c.isalnum() or c in '-_' else '.' for c in command_path)
+    now = time.time()
+    stamp = time.strftime('%Y%m%dT%H%M%S', time.localtime(now)) + f'.{int(now % 1 * 1000):03d}'
+    directory = get_directory()
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f'{name}-{stamp}-{os.getpid()}-{next(_results)}{suffix}')
+
+
+def is_enabled(ctx: click.Context) -> bool:
+    environ = os.environ
+    return (
+        _KEY_PROFILE in ctx.meta or
+        ENV_PROFILE in environ or
+        ENV_MEMORY in environ or
+        ENV_MEMORY_BUDGET in environ
+    )
+
+def get_profile_scope(ctx: click.Context):
+    'return the scope to profile, or `None` if disabled.'
+    scope = ctx.meta.get(_KEY_PROFILE) or os.environ.get(ENV_PROFILE)
+    if not scope or scope == '0':
+        return None
+    if scope == '1':
+        return SCOPE_BODY
+    if scope not in _SCOPES:
+        raise ValueError(f'{ENV_PROFILE} must be one of {_SCOPES}, not {scope!r}')
+    return scope
+
+def _get_env_number(name: str, default, factory):
+    value = os.environ.get(name)
+    if not value:
+        return default
+    try:
+        return factory(value)
+    except ValueError:
+        raise ValueError(f'{name} must be a number, not {value!r}') from None
+
+def _should_sample() -> bool:
+    return next(_invocations) % max(_get_env_number(ENV_PROFILE_SAMPLE, 1, int), 1) == 0
+
+def _run_profiled(ctx: click.Context, func):
+    import cProfile
+
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    try:
+        return profiler.runcall(func)
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms >= _get_env_number(ENV_PROFILE_MIN_MS, 0, float):
+            command_path = ctx.meta.get(_KEY_COMMAND_PATH, ctx.command_path)
+            path = make_result_path(command_path, '.pstats')
+            profiler.dump_stats(path)
+            emit('profile', command_path, path=path, elapsed_ms=elapsed_ms)
+
+
+class MemoryBudgetExceeded(click.ClickException):
+    def __init__(self, command_path: str, peak: int, budget: int):
+        super().__init__(f'{command_path} allocated {peak} bytes, exceeds the memory budget {budget} bytes.')
+        self.peak = peak
+        self.budget = budget
+
+
+class _MemoryTracker:
+    '''
+    track the allocations of a invocation by tracemalloc.
+    '''
+
+    def __init__(self):
+        import tracemalloc
+
+        self._tracemalloc = tracemalloc
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start(_get_env_number(ENV_MEMORY_FRAMES, 5, int))
+        self._before = self._take_snapshot()
+        # the peak is of this invocation only if the tracing just started or it can be reset.
+        self._has_peak = self._started or hasattr(tracemalloc, 'reset_peak')
+        if hasattr(tracemalloc, 'reset_peak'): # python 3.9+
+            tracemalloc.reset_peak()
+        self._start = tracemalloc.get_traced_memory()[0]
+        self.marks = {}
+
+    def _take_snapshot(self):
+        tracemalloc = self._tracemalloc
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+
+    def mark(self, name: str):
+        'record the retained bytes since the tracker started.'
+        self.marks[name] = self._tracemalloc.get_traced_memory()[0] - self._start
+
+    def stop(self) -> dict:
+        tracemalloc = self._tracemalloc
+        current, peak = tracemalloc.get_traced_memory()
+        after = self._take_snapshot()
+        if self._started:
+            tracemalloc.stop()
+
+        top = []
+        for stat in after.compare_to(self._before, 'traceback')[:_get_env_number(ENV_MEMORY_TOP, 10, int)]:
+            if stat.size_diff <= 0:
+                break
+            top.append({
+                'size_diff': stat.size_diff,
+                'count_diff': stat.count_diff,
+                'traceback': [f'{x.filename}:{x.lineno}' for x in stat.traceback],
+            })
+        return {
+            # `None` if unavailable, e.g. python 3.8 and the tracing was started by others
+            'peak': peak - self._start if self._has_peak else None,
+            'retained': current - self._start,
+            'marks': self.marks,
+            'top': top,
+        }
+
+
+def mark(name: str):
+    '''
+    mark the memory usage of the current command if it is tracked, e.g. after the injectors resolved.
+    '''
+    if _memory_trackers:
+        _memory_trackers[-1].mark(name)
+
+def _run_memory_tracked(ctx: click.Context, func, budget: int, report: bool):
+    command_path = ctx.meta[_KEY_COMMAND_PATH]
+    tracker = _MemoryTracker()
+    _memory_trackers.append(tracker)
+    try:
+        return func()
+    finally:
+        _memory_trackers.pop()
+        result = tracker.stop()
+        if report:
+            import json
+            path = make_result_path(command_path, '.memory.json')
+            with open(path, 'w', encoding='utf-8') as fp:
+                json.dump(dict(result, command=command_path), fp, indent=2)
+            emit('memory', command_path, path=path, **result)
+        if budget is not None:
+            # the retained bytes is the lower bound of the peak
+            peak = result['peak'] if result['peak'] is not None else result['retained']
+            if peak > budget:
+                _on_budget_exceeded(command_path, peak, budget)
+
+def _on_budget_exceeded(command_path: str, peak: int, budget: int):
+    emit('memory_budget_exceeded', command_path, peak=peak, budget=budget)
+    action = os.environ.get(ENV_MEMORY_BUDGET_ACTION) or 'log'
+    if action == 'abort':
+        raise MemoryBudgetExceeded(command_path, peak, budget)
+    click.echo(f'click_anno: {command_path} allocated {peak} bytes, '
+               f'exceeds the memory budget {budget} bytes.', err=True)
+
+
+def run_command(ctx: click.Context, func, memory_budget: int = None):
+    '''
+    call `func()` which invoke the callback of `ctx.command`, with the enabled instruments.
+    '''
+    if isinstance(ctx.command, click.MultiCommand):
+        return func() # the group callback, see `run_invocation()`
+    ctx.meta[_KEY_COMMAND_PATH] = ctx.command_path
+
+    if memory_budget is None:
+        memory_budget = _get_env_number(ENV_MEMORY_BUDGET, None, int)
+    report_memory = os.environ.get(ENV_MEMORY, '0') != '0'
+    if report_memory or memory_budget is not None:
+        func = functools.partial(_run_memory_tracked, ctx, func, memory_budget, report_memory)
+
+    scope = get_profile_scope(ctx)
+    if scope == SCOPE_BODY or (scope == SCOPE_INVOCATION and ctx.parent is None):
+        if _should_sample():
+            return _run_profiled(ctx, func)
+    return func()
+
+def run_invocation(ctx: click.Context, func):
+    '''
+    call `func()` which invoke the root group, with the enabled instruments.
+    '''
+    if get_profile_scope(ctx) == SCOPE_INVOCATION and _should_sample():
+        return _run_profiled(ctx, func)
+    return func()
+
+
+def _set_profile(ctx, param, value):
+    if value:
+        ctx.meta[_KEY_PROFILE] = value
+
+def make_profile_option() -> click.Option:
+    'make the hidden option `--click-anno-profile`.'
+    return click.Option(['--click-anno-profile'], type=click.Choice(_SCOPES), hidden=True,
+        expose_value=False, is_eager=True, callback=_set_profile)
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+'''
+describe the command tree which built by click_anno, with the build cost of each node.
+
+usage:
+
+``` shell
+python -m click_anno.introspect package.module:App --format json --memory
+```
+'''
+
+import json
+import inspect
+
+import click
+
+from .core import command, get_build_info
+from .types import flag
+from .utils import load_target
+
+
+def _get_source(target):
+    target = getattr(target, '__func__', target) # staticmethod or classmethod
+    try:
+        path = inspect.getsourcefile(target)
+        line = inspect.getsourcelines(target)[1]
+    except (OSError, TypeError):
+        return None
+    return {'file': path, 'line': line}
+
+def _to_jsonable(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_to_jsonable(x) for x in value]
+    return repr(value)
+
+def _describe_param(param: click.Parameter) -> dict:
+    return {
+        'name': param.name,
+        'kind': param.param_type_name,
+        'opts': param.opts + param.secondary_opts,
+        'type': param.type.name,
+        'required': param.required,
+        'default': _to_jsonable(param.default),
+        'nargs': param.nargs,
+        'multiple': param.multiple,
+        'is_flag': getattr(param, 'is_flag', False),
+    }
+
+def _describe_injected(info) -> list:
+    injected = []
+    for adapter in info.adapter.args_adapters:
+        injector = adapter._injector
+        if injector:
+            injected.append({'name': adapter._parameter_name, 'injector': type(injector).__name__})
+    return injected
+
+def _describe(cmd: click.BaseCommand, name: str) -> dict:
+    info = get_build_info(cmd)
+    node = {
+        'name': name,
+        'kind': info.kind if info is not None else 'click',
+        'help': cmd.get_short_help_str() if isinstance(cmd, click.Command) else '',
+        'hidden': getattr(cmd, 'hidden', False),
+        'aliases': [],
+        'source': None,
+        'anno_attrs': {},
+        'params': [_describe_param(x) for x in cmd.params],
+        'injected': [],
+        'build_time': None,
+        'build_memory': None,
+        'build_self_time': None,
+        'build_self_memory': None,
+    }
+    if info is not None:
+        node['source'] = _get_source(info.target)
+        node['anno_attrs'] = {k: _to_jsonable(v) for k, v in info.anno_attrs.items()}
+        node['injected'] = _describe_injected(info)
+        node['build_time'] = node['build_self_time'] = info.build_time
+        node['build_memory'] = node['build_self_memory'] = info.build_memory
+
+    if isinstance(cmd, click.MultiCommand):
+        node['commands'] = children = []
+        origins = {} # key of the target -> node
+        # the visible one is the origin of aliases
+        items = sorted(getattr(cmd, 'commands', {}).items(), key=lambda x: getattr(x[1], 'hidden', False))
+        for sub_name, sub_cmd in items:
+            sub_info = get_build_info(sub_cmd)
+            key = id(sub_info.target) if sub_info is not None else id(sub_cmd)
+            origin = origins.get(key)
+            if origin is not None: # alias
+                origin['aliases'].append(sub_name)
+                continue
+            origins[key] = child = _describe(sub_cmd, sub_name)
+            children.append(child)
+
+        for key in ('time', 'memory'):
+            total = node[f'build_{key}']
+            if total is not None:
+                node[f'build_self_{key}'] = total - sum(x[f'build_{key}'] or 0 for x in children)
+    return node
+
+def describe(app: click.BaseCommand) -> dict:
+    '''
+    describe the command tree of `app` as a jsonable dict.
+
+    each node contains the aliases, the click parameters, the injected parameters, the source location,
+    and the build cost: `build_time` (seconds) and `build_memory` (bytes, only if tracemalloc is tracing),
+    which include the subcommands; `build_self_*` exclude them.
+    '''
+    if not isinstance(app, click.BaseCommand):
+        raise TypeError(f'{app!r} is not a click command')
+    return _describe(app, app.name)
+
+
+def _format_size(size: int) -> str:
+    for unit in ('B', 'KiB', 'MiB'):
+        if abs(size) < 1024:
+            return f'{size:.1f}{unit}' if unit != 'B' else f'{size}{unit}'
+        size /= 1024
+    return f'{size:.1f}GiB'
+
+def _format_node(node: dict, lines: list, indent: str):
+    parts = [f'{indent}{node["name"]} [{node["kind"]}]']
+    if node['build_time'] is not None:
+        cost = f'{node["build_time"] * 1000:.2f}ms'
+        if node['build_memory'] is not None:
+            cost += f' {_format_size(node["build_memory"])}'
+        parts.append(cost)
+    if node['aliases']:
+        parts.append(f'(aliases: {", ".join(node["aliases"])})')
+    if node['source']:
+        parts.append(f'{node["source"]["file"]}:{node["source"]["line"]}')
+    lines.append('  '.join(parts))
+
+    for param in node['params']:
+        name = ', '.join(param['opts']) if param['kind'] == 'option' else param['name'].upper()
+        desc = f'{indent}    - {name}: {param["kind"]} {param["type"]}'
+        if param['required']:
+            desc += ' required'
+        elif param['default'] is not None:
+            desc += f' default={param["default"]}'
+        lines.append(desc)
+    for item in node['injected']:
+        lines.append(f'{indent}    - {item["name"]}: injected by {item["injector"]}')
+    for child in node.get('commands', ()):
+        _format_node(child, lines, indent + '  ')
+
+def format_tree(node: dict) -> str:
+    'format the result of `describe()` as a text tree.'
+    lines = []
+    _format_node(node, lines, '')
+    return '\n'.join(lines)
+
+
+@command
+def main(target, *, format: click.Choice(['text', 'json']) = 'text', memory: flag = False):
+    '''
+    describe the command tree of TARGET (`module:attr`).
+    '''
+    if memory:
+        import tracemalloc
+        tracemalloc.start() # before the target was built
+    node = describe(load_target(target))
+    if format == 'json':
+        click.echo(json.dumps(node, indent=2))
+    else:
+        click.echo(format_tree(node))
+
+
+if __name__ == '__main__':
+    main(prog_name='python -m click_anno.introspect')
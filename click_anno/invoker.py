@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+import io
+import sys
+
+import click
+from click.exceptions import ClickException, Exit, Abort
+
+
+class InvokeResult:
+    '''
+    the result of `Invoker.invoke()`.
+    '''
+    __slots__ = ('return_value', 'stdout_bytes', 'stderr_bytes', 'exit_code', 'exception', '_charset')
+
+    def __init__(self, return_value, stdout_bytes: bytes, stderr_bytes: bytes, exit_code: int,
+                 exception: BaseException, charset: str):
+        self.return_value = return_value
+        self.stdout_bytes = stdout_bytes
+        self.stderr_bytes = stderr_bytes
+        self.exit_code = exit_code
+        self.exception = exception
+        self._charset = charset
+
+    @property
+    def output(self) -> str:
+        return self.stdout_bytes.decode(self._charset, 'replace').replace('\r\n', '\n')
+
+    @property
+    def stderr(self) -> str:
+        return self.stderr_bytes.decode(self._charset, 'replace').replace('\r\n', '\n')
+
+    def __repr__(self):
+        return f'<{type(self).__name__} exit_code={self.exit_code} exception={self.exception!r}>'
+
+
+class _PooledOutput:
+    'a reusable text stream which write into a `BytesIO`.'
+    __slots__ = ('_buffer', 'stream')
+
+    def __init__(self, charset: str):
+        self._buffer = io.BytesIO()
+        self.stream = io.TextIOWrapper(self._buffer, encoding=charset, write_through=True)
+
+    def take(self) -> bytes:
+        self.stream.flush()
+        value = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return value
+
+
+class Invoker:
+    '''
+    a lightweight in-process invoker for commands built by `click_app` or `command`.
+
+    unlike `click.testing.CliRunner`, it does not isolate stdin or env,
+    it only redirect stdout and stderr into pooled buffers,
+    so it is cheap to invoke the command tree many times.
+
+    the invoker is not thread safe since it redirect `sys.stdout` and `sys.stderr`.
+    '''
+
+    def __init__(self, cli: click.BaseCommand, prog_name: str = None, charset: str = 'utf-8',
+                 **context_settings):
+        self._cli = cli
+        self._prog_name = prog_name or cli.name
+        self._charset = charset
+        self._context_settings = context_settings # pass into `make_context()` for each invocation
+        self._stdout = _PooledOutput(charset)
+        self._stderr = _PooledOutput(charset)
+
+    def _invoke(self, args: list, extra: dict):
+        ctx = self._cli.make_context(self._prog_name, args, **extra)
+        with ctx:
+            return self._cli.invoke(ctx)
+
+    def invoke(self, args=(), **context_settings) -> InvokeResult:
+        '''
+        invoke the command with `args` (without the program name),
+        `context_settings` will override the settings from `__init__`.
+        '''
+        extra = self._context_settings
+        if context_settings:
+            extra = dict(extra, **context_settings)
+
+        return_value = None
+        exception = None
+        exit_code = 0
+
+        old_stdout, old_stderr = sys.stdout, sys.stderr
+        sys.stdout, sys.stderr = self._stdout.stream, self._stderr.stream
+        try:
+            return_value = self._invoke(list(args), extra)
+        except ClickException as e:
+            e.show()
+            exit_code = e.exit_code
+        except Exit as e:
+            exit_code = e.exit_code
+        except Abort:
+            click.echo('Aborted!', err=True)
+            exit_code = 1
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            if exit_code != 0:
+                exception = e
+        except Exception as e:
+            exit_code = 1
+            exception = e
+        finally:
+            sys.stdout, sys.stderr = old_stdout, old_stderr
+
+        return InvokeResult(
+            return_value=return_value,
+            stdout_bytes=self._stdout.take(),
+            stderr_bytes=self._stderr.take(),
+            exit_code=exit_code,
+            exception=exception,
+            charset=self._charset,
+        )
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+import os
+from collections.abc import Iterable, Mapping
+
+import click
+
+FORMATS = ('jsonl', 'json', 'tsv')
+
+# flush the buffer into stdout once it grows over this size.
+BUFFER_SIZE = 1 << 20
+
+
+_orjson = None
+
+def _get_orjson():
+    'import `orjson` on first use, return `False` if it was not installed.'
+    global _orjson
+    if _orjson is None:
+        try:
+            import orjson as _orjson
+        except ImportError:
+            _orjson = False
+    return _orjson
+
+def _dumps_json(obj) -> bytes:
+    orjson = _get_orjson()
+    if orjson:
+        try:
+            return orjson.dumps(obj, default=str)
+        except TypeError: # e.g. non-str keys
+            pass
+    import json
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+
+def _escape_tsv_field(value) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, bytes):
+        value = value.decode('utf-8', 'replace')
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+def _dumps_tsv(fields) -> bytes:
+    return '\t'.join(_escape_tsv_field(x) for x in fields).encode('utf-8')
+
+def _is_records(result) -> bool:
+    'check if the `result` should be treat as many records.'
+    return isinstance(result, Iterable) and not isinstance(result, (str, bytes, Mapping))
+
+def _iter_lines(records, fmt: str):
+    if fmt == 'jsonl':
+        for record in records:
+            yield _dumps_json(record) + b'\n'
+
+    elif fmt == 'json':
+        sep = b'['
+        for record in records:
+            yield sep + _dumps_json(record)
+            sep = b','
+        yield b'[]\n' if sep == b'[' else b']\n'
+
+    elif fmt == 'tsv':
+        header = None
+        for record in records:
+            if isinstance(record, Mapping):
+                if header is None:
+                    header = tuple(record)
+                    yield _dumps_tsv(header) + b'\n'
+                fields = [record.get(k) for k in header]
+            elif _is_records(record):
+                fields = record
+            else:
+                fields = (record, )
+            yield _dumps_tsv(fields) + b'\n'
+
+    else:
+        raise ValueError(f'unknown output format: {fmt!r}')
+
+
+def _silence_stdout(stream):
+    # python will flush stdout again at exit,
+    # redirect it to devnull so the broken pipe does not raise again.
+    try:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, stream.fileno())
+    except (AttributeError, ValueError, OSError):
+        pass
+
+
+def write_result(result, fmt: str):
+    '''
+    serialize `result` as `fmt` and write it into stdout.
+
+    if `result` is a iterable (except `str`, `bytes` and `Mapping`),
+    each item is a record, otherwise `result` is the only record.
+    '''
+    if fmt not in FORMATS:
+        raise ValueError(f'unknown output format: {fmt!r}')
+
+    if result is None:
+        return
+
+    if fmt == 'json' and not _is_records(result):
+        records = None
+        lines = (_dumps_json(result) + b'\n', )
+    else:
+        records = result if _is_records(result) else (result, )
+        lines = _iter_lines(records, fmt)
+
+    # text stdout may has buffered data
+    click.get_text_stream('stdout').flush()
+    stream = click.get_binary_stream('stdout')
+
+    buffer = bytearray()
+    try:
+        for line in lines:
+            buffer += line
+            if len(buffer) >= BUFFER_SIZE:
+                stream.write(buffer)
+                buffer.clear()
+        if buffer:
+            stream.write(buffer)
+        stream.flush()
+    except BrokenPipeError:
+        # reader was closed (e.g. `| head`), stop cleanly.
+        _silence_stdout(stream)
+    finally:
+        close = getattr(records, 'close', None)
+        if close is not None:
+            close()
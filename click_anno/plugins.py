@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+'''
+mount subcommands from a entry point group, e.g. `click_app(plugins='mycli.commands')`.
+
+the index of entry points is cached on disk, keyed by the state of the site-packages directories,
+and each plugin is imported only when it is invoked.
+
+before a plugin was loaded, its help is the summary of the distribution,
+after that the help of the command is stored in the index.
+'''
+
+import os
+import sys
+
+import click
+
+from .utils import load_target
+
+
+def _get_default_directory():
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'click_anno', 'plugins')
+
+# the directories where the distributions are installed
+_SITE_DIR_NAMES = ('site-packages', 'dist-packages')
+
+def _get_site_dirs() -> list:
+    'get the site directories from `sys.path`, the source directories (and the cwd) are ignored.'
+    return [x for x in sys.path if x and os.path.basename(os.path.normpath(x)) in _SITE_DIR_NAMES]
+
+def _get_metadata():
+    try:
+        from importlib import metadata
+    except ImportError: # python 3.7
+        try:
+            import importlib_metadata as metadata
+        except ImportError:
+            raise ImportError('plugins require python 3.8+ or `importlib_metadata`') from None
+    return metadata
+
+def _warn(message: str):
+    click.echo(f'click_anno: {message}', err=True)
+
+
+class PluginIndex:
+    '''
+    the index `name -> (target, summary)` of a entry point group.
+
+    the index is rebuilt only if any site-packages directory was changed,
+    e.g. a distribution was installed or removed.
+    '''
+
+    def __init__(self, group: str, directory: str = None):
+        self.group = group
+        self.directory = directory or _get_default_directory()
+        self._key = None
+        self._entries = None
+        self._broken = set()
+
+    @staticmethod
+    def get_state_key() -> str:
+        import hashlib
+
+        state = [sys.version, sys.prefix]
+        for path in _get_site_dirs():
+            try:
+                state.append((path, os.stat(path).st_mtime_ns))
+            except OSError:
+                state.append((path, None))
+        return hashlib.sha256(repr(state).encode()).hexdigest()
+
+    def _get_path(self) -> str:
+        name = ''.join(c if c.isalnum() or c in '-_.' else '_' for c in self.group)
+        return os.path.join(self.directory, name + '.json')
+
+    def _load_cached(self, key: str):
+        import json
+
+        try:
+            with open(self._get_path(), encoding='utf-8') as fp:
+                data = json.load(fp)
+        except (OSError, ValueError):
+            return None
+        if data.get('key') != key:
+            return None
+        return {name: tuple(value) for name, value in data['entries'].items()}
+
+    def _store(self, key: str, entries: dict):
+        import json
+        import tempfile
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as fp:
+                json.dump({'key': key, 'entries': entries}, fp)
+            os.replace(tmp_path, self._get_path())
+        except OSError: # the cache is optional
+            pass
+
+    def scan(self) -> dict:
+        'scan the entry points without the cache.'
+        metadata = _get_metadata()
+
+        entries = {}
+        for dist in metadata.distributions():
+            for entry_point in dist.entry_points:
+                if entry_point.group == self.group and entry_point.name not in entries:
+                    entries[entry_point.name] = (entry_point.value, dist.metadata.get('Summary') or '')
+        return entries
+
+    def get_entries(self) -> dict:
+        '''
+        get the index `name -> (target, summary)`.
+        '''
+        if self._entries is None:
+            key = self._key = self.get_state_key()
+            entries = self._load_cached(key)
+            if entries is None:
+                try:
+                    entries = self.scan()
+                except ImportError: # missing `importlib_metadata`, not a broken plugin
+                    raise
+                except Exception as e: # keep the cli usable
+                    _warn(f'unable to scan plugins from {self.group!r}: {e!r}')
+                    entries = {}
+                else:
+                    self._store(key, entries)
+            self._entries = entries
+        return self._entries
+
+    def _update_summary(self, name: str, cmd: click.BaseCommand):
+        'replace the summary of the distribution with the help of the command.'
+        summary = getattr(cmd, 'short_help', None) or getattr(cmd, 'help', None) or ''
+        target, old_summary = self._entries[name]
+        if summary != old_summary:
+            self._entries[name] = (target, summary)
+            if self._key is not None:
+                self._store(self._key, self._entries)
+
+    def load(self, name: str, defaults=None) -> click.BaseCommand:
+        '''
+        import and build the plugin, return `None` if the plugin does not exist or it is broken.
+
+        `defaults` is the default anno attrs (e.g. `output`) from the parent group.
+        '''
+        entry = self.get_entries().get(name)
+        if entry is None or name in self._broken:
+            return None
+        target = entry[0].partition('[')[0].strip() # remove extras
+        try:
+            cmd = _build(load_target(target), defaults)
+        except Exception as e: # a broken plugin should not break the cli
+            self._broken.add(name)
+            _warn(f'unable to load plugin {name!r} ({target}): {e!r}')
+            return None
+        self._update_summary(name, cmd)
+        return cmd
+
+
+def _build(target, defaults=None) -> click.BaseCommand:
+    from .core import click_app, _make_command
+
+    if isinstance(target, click.BaseCommand):
+        return target
+    if isinstance(target, type):
+        options = {k: v for k, v in vars(defaults).items() if v is not None} if defaults is not None else {}
+        return click_app(target, **options)
+    if callable(target):
+        return _make_command(target, defaults)
+    raise TypeError(f'{target!r} is not a command')
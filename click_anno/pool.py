@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+'''
+a thread safe pool for expensive resources like database connections.
+'''
+
+import time
+import threading
+from collections import deque
+
+
+def _close_resource(resource):
+    close = getattr(resource, 'close', None)
+    if close is not None:
+        close()
+
+
+class ResourcePool:
+    '''
+    a bounded pool which reuse the resources created by `factory()`.
+
+    - `max_size`: the max number of resources (in use and idle), `acquire()` will wait if exhausted;
+    - `validate`: `validate(resource) -> bool`, check the idle resource before hand out;
+    - `idle_timeout`: discard the idle resources which was not used in the seconds;
+    - `close`: `close(resource)` for discarded resources, call `resource.close()` by default.
+    '''
+
+    def __init__(self, factory, max_size: int = 8, validate=None, idle_timeout: float = None, close=None):
+        if not callable(factory):
+            raise TypeError('factory must be callable')
+        if max_size < 1:
+            raise ValueError('max_size must be greater than 0')
+        self._factory = factory
+        self.max_size = max_size
+        self._validate = validate
+        self.idle_timeout = idle_timeout
+        self._close = close or _close_resource
+        self._idle = deque() # (resource, last used time), the last one is the most recently used
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self._stats = dict.fromkeys(('created', 'reused', 'discarded', 'evicted', 'waited'), 0)
+
+    def _count(self, key: str):
+        with self._cond:
+            self._stats[key] += 1
+
+    def _discard(self, resource, key: str):
+        self._count(key)
+        try:
+            self._close(resource)
+        except Exception: # the resource may already broken
+            pass
+
+    def _evict_idle(self, now: float) -> list:
+        'pop the idle resources which are timeout, close them outside the lock.'
+        evicted = []
+        if self.idle_timeout is not None:
+            deadline = now - self.idle_timeout
+            while self._idle and self._idle[0][1] <= deadline:
+                evicted.append(self._idle.popleft()[0])
+        return evicted
+
+    def _is_valid(self, resource) -> bool:
+        if self._validate is None:
+            return True
+        try:
+            return bool(self._validate(resource))
+        except Exception:
+            return False
+
+    def acquire(self, timeout: float = None):
+        '''
+        get a resource from the pool, raise `TimeoutError` if the pool is still exhausted after `timeout` seconds.
+        '''
+        while True:
+            with self._cond:
+                evicted = self._evict_idle(time.monotonic())
+                if not self._idle and self._in_use >= self.max_size:
+                    self._stats['waited'] += 1
+                    if not self._cond.wait_for(lambda: self._idle or self._in_use < self.max_size, timeout):
+                        raise TimeoutError(f'unable to acquire a resource in {timeout}s')
+                resource = self._idle.pop()[0] if self._idle else None
+                self._in_use += 1
+            for item in evicted:
+                self._discard(item, 'evicted')
+
+            if resource is None:
+                try:
+                    resource = self._factory()
+                except BaseException:
+                    self._return_slot()
+                    raise
+                self._count('created')
+                return resource
+
+            if self._is_valid(resource):
+                self._count('reused')
+                return resource
+            self._discard(resource, 'discarded')
+            self._return_slot()
+
+    def _return_slot(self):
+        with self._cond:
+            self._in_use -= 1
+            self._cond.notify()
+
+    def release(self, resource, discard: bool = False):
+        '''
+        return the resource into the pool, or close it if `discard` is `True`.
+        '''
+        if discard:
+            self._discard(resource, 'discarded')
+            self._return_slot()
+            return
+        with self._cond:
+            self._in_use -= 1
+            self._idle.append((resource, time.monotonic()))
+            self._cond.notify()
+
+    def clear(self):
+        'close all idle resources.'
+        with self._cond:
+            idle = [x[0] for x in self._idle]
+            self._idle.clear()
+        for resource in idle:
+            self._discard(resource, 'evicted')
+
+    def stats(self) -> dict:
+        '''
+        return the statistics of the pool:
+
+        - `created`, `reused`, `discarded`, `evicted`, `waited`: the counters since created;
+        - `in_use`, `idle`: the current number of resources.
+        '''
+        with self._cond:
+            return dict(self._stats, in_use=self._in_use, idle=len(self._idle))
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+'''
+opt-in progress of the streaming parameters, enable it by `attrs(progress=True)` or `click_app(progress=True)`.
+
+the files (`click.File`) count the read or written size, the streams (`stream(T)`) count the items.
+the hot loop only increase a counter, the progress is rendered on stderr by a timer thread,
+and only if stderr is a tty.
+
+for the text files which opened for reading, the read size is the position of the binary buffer,
+so the text is not encoded again for counting; the unseekable text streams count the chars.
+
+when the command finished, the throughput is emitted as the event `progress`, see `instrument.add_listener()`.
+'''
+
+import os
+import time
+import threading
+
+import click
+
+from . import instrument
+
+REFRESH_INTERVAL = 0.5 # seconds
+
+UNIT_BYTES = 'bytes'
+UNIT_CHARS = 'chars'
+UNIT_ITEMS = 'items'
+
+
+class _Counter:
+    __slots__ = ('name', 'unit', 'count', 'total', 'get_position')
+
+    def __init__(self, name: str, unit: str, total: int = None):
+        self.name = name
+        self.unit = unit
+        self.count = 0
+        self.total = total
+        self.get_position = None # read the count from the file position instead
+
+    def get_count(self) -> int:
+        if self.get_position is not None:
+            try:
+                self.count = self.get_position()
+            except (ValueError, OSError): # e.g. closed, keep the last position
+                pass
+        return self.count
+
+
+def _ignore(data):
+    pass
+
+
+class _ProgressFile:
+    '''
+    a proxy of the file object which count the read or written size.
+    '''
+
+    def __init__(self, fp, counter: _Counter):
+        self._fp = fp
+        self._counter = counter
+        self._iter = None
+
+    def _count(self, data):
+        # the first call, the lazy file is opened now, choose how to count.
+        self._count = self._get_count_func(data)
+        self._count(data)
+
+    def _get_count_func(self, data):
+        fp = self._fp
+        counter = self._counter
+        if isinstance(data, str): # text mode
+            buffer = getattr(fp, 'buffer', None)
+            if 'r' in getattr(fp, 'mode', '') and buffer is not None and _is_seekable(buffer):
+                counter.get_position = buffer.tell
+                if counter.total is None:
+                    counter.total = _get_file_size(fp)
+                return _ignore
+            counter.unit = UNIT_CHARS
+
+        def count(data):
+            counter.count += len(data)
+        return count
+
+    def read(self, *args):
+        data = self._fp.read(*args)
+        self._count(data)
+        return data
+
+    def readline(self, *args):
+        line = self._fp.readline(*args)
+        self._count(line)
+        return line
+
+    def readlines(self, *args):
+        lines = self._fp.readlines(*args)
+        for line in lines:
+            self._count(line)
+        return lines
+
+    def write(self, data):
+        self._count(data)
+        return self._fp.write(data)
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._iter is None:
+            self._iter = iter(self._fp) # e.g. `click.utils.LazyFile` is not a iterator
+        line = next(self._iter)
+        self._count(line)
+        return line
+
+    def close(self):
+        self._counter.get_count() # before the position is unavailable
+        return self._fp.close()
+
+    def __enter__(self):
+        self._fp.__enter__()
+        return self
+
+    def __exit__(self, *args):
+        self._counter.get_count()
+        return self._fp.__exit__(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._fp, name)
+
+
+def _is_seekable(fp) -> bool:
+    try:
+        return fp.seekable()
+    except Exception: # e.g. closed
+        return False
+
+def _get_file_size(fp):
+    'get the size of the file which opened for reading, `None` if unknown.'
+    if 'r' not in getattr(fp, 'mode', 'r'):
+        return None
+    try:
+        size = os.fstat(fp.fileno()).st_size
+    except Exception: # e.g. pipe or `io.StringIO`
+        return None
+    return size or None
+
+def _count_items(items, counter: _Counter):
+    for item in items:
+        counter.count += 1
+        yield item
+
+
+def _format_count(count: float, unit: str) -> str:
+    if unit == UNIT_BYTES:
+        for prefix in ('B', 'KiB', 'MiB', 'GiB'):
+            if abs(count) < 1024 or prefix == 'GiB':
+                return f'{count:.0f}{prefix}' if prefix == 'B' else f'{count:.1f}{prefix}'
+            count /= 1024
+    return f'{count:,.0f} {unit}'
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    return f'{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}'
+
+
+class Progress:
+    '''
+    the progress of a invocation, which render the counters on `stream` every `interval` seconds.
+    '''
+
+    def __init__(self, command_path: str, stream=None, interval: float = REFRESH_INTERVAL):
+        self.command_path = command_path
+        self.stream = stream if stream is not None else click.get_text_stream('stderr')
+        self.interval = interval
+        self.counters = []
+        self._start = None
+        self._stopped = threading.Event()
+        self._thread = None
+        self._width = 0
+
+    def wrap(self, name: str, value):
+        '''
+        wrap `value` (a file or a iterator) to count the progress,
+        return the `value` itself if it is unable to count.
+        '''
+        if isinstance(value, click.utils.LazyFile): # do not open it now
+            counter = _Counter(name, UNIT_BYTES)
+            wrapped = _ProgressFile(value, counter)
+        elif hasattr(value, 'read') or hasattr(value, 'write'):
+            counter = _Counter(name, UNIT_BYTES, _get_file_size(value))
+            wrapped = _ProgressFile(value, counter)
+        elif hasattr(value, '__next__'):
+            counter = _Counter(name, UNIT_ITEMS)
+            wrapped = _count_items(value, counter)
+        else:
+            return value
+        self.counters.append(counter)
+        return wrapped
+
+    def is_rendering(self) -> bool:
+        try:
+            return self.stream.isatty()
+        except Exception: # e.g. closed
+            return False
+
+    def start(self):
+        self._start = time.perf_counter()
+        if self.counters and self.is_rendering():
+            self._thread = threading.Thread(target=self._run, name='click_anno.progress', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self._render(self.format())
+
+    def _render(self, line: str):
+        padding = ' ' * max(self._width - len(line), 0)
+        self._width = len(line)
+        self.stream.write(f'\r{line}{padding}')
+        self.stream.flush()
+
+    def get_elapsed(self) -> float:
+        return time.perf_counter() - self._start
+
+    def format(self) -> str:
+        'format the counters as one line, e.g. `ids: 1,000 items 500 items/s`.'
+        elapsed = self.get_elapsed()
+        parts = []
+        for counter in self.counters:
+            count = counter.get_count()
+            rate = count / elapsed if elapsed > 0 else 0
+            text = f'{counter.name}: {_format_count(count, counter.unit)}'
+            if counter.total:
+                text += f'/{_format_count(counter.total, counter.unit)}'
+            text += f' {_format_count(rate, counter.unit)}/s'
+            if counter.total and rate > 0:
+                text += f' ETA {_format_duration(max(counter.total - count, 0) / rate)}'
+            parts.append(text)
+        return ' | '.join(parts)
+
+    def close(self):
+        'stop the rendering and emit the throughput.'
+        if self._thread is not None:
+            self._stopped.set()
+            self._thread.join()
+            self._thread = None
+            self._render(self.format())
+            self.stream.write('\n')
+            self.stream.flush()
+        elapsed = self.get_elapsed()
+        instrument.emit('progress', self.command_path, elapsed=elapsed, counters=[
+            {
+                'name': x.name,
+                'unit': x.unit,
+                'count': x.get_count(),
+                'total': x.total,
+                'rate': x.count / elapsed if elapsed > 0 else None,
+            } for x in self.counters
+        ])
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+'''
+hot reload the changed subtree of a `click_app` in long-running processes.
+'''
+
+import os
+import sys
+import threading
+import importlib
+
+import click
+
+from .core import get_build_info, BuildInfo
+
+
+def _get_module_name(target):
+    target = getattr(target, '__func__', target) # staticmethod or classmethod
+    return getattr(target, '__module__', None)
+
+def _resolve(module, qualname: str):
+    'resolve the class from the reloaded module, the class may already built as a click group.'
+    obj = module
+    for part in qualname.split('.'):
+        info = get_build_info(obj)
+        if info is not None:
+            obj = info.target
+        obj = getattr(obj, part)
+    info = get_build_info(obj)
+    return info.target if info is not None else obj
+
+
+class _Node:
+    __slots__ = ('group', 'info', 'parent', 'name', 'modules')
+
+    def __init__(self, group: click.Group, info: BuildInfo, parent: click.Group, name: str):
+        self.group = group
+        self.info = info
+        self.parent = parent
+        self.name = name # name in the parent group
+        self.modules = {_get_module_name(info.target)}
+        for command in group.commands.values():
+            command_info = get_build_info(command)
+            if command_info is not None and command_info.kind == BuildInfo.KIND_METHOD:
+                self.modules.add(_get_module_name(command_info.target))
+        self.modules.discard(None)
+
+
+class Reloader:
+    '''
+    track the modules which produced each group of the `app`,
+    re-import the changed modules and rebuild the affected groups only.
+
+    the rebuilt group will be swapped into the parent group,
+    and the nested groups which are not affected are re-attached into it without rebuilding.
+    '''
+
+    def __init__(self, app: click.Group):
+        if get_build_info(app) is None:
+            raise ValueError(f'{app!r} was not built by click_app')
+        self._app = app
+        self._mtimes = {} # module name -> mtime
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._snapshot()
+
+    def _iter_nodes(self, group: click.Group, parent: click.Group = None, name: str = None):
+        info = get_build_info(group)
+        if info is None or info.kind != BuildInfo.KIND_GROUP:
+            return
+        node = _Node(group, info, parent, name)
+        yield node
+        for sub_name, command in list(group.commands.items()):
+            yield from self._iter_nodes(command, group, sub_name)
+
+    @staticmethod
+    def _get_mtime(module_name: str):
+        path = getattr(sys.modules.get(module_name), '__file__', None)
+        if path:
+            try:
+                return os.stat(path).st_mtime_ns
+            except OSError:
+                pass
+
+    def _snapshot(self):
+        self._mtimes.clear()
+        for node in self._iter_nodes(self._app):
+            for module_name in node.modules:
+                self._mtimes[module_name] = self._get_mtime(module_name)
+
+    def get_changed_modules(self) -> set:
+        return {name for name, mtime in self._mtimes.items() if self._get_mtime(name) != mtime}
+
+    def _is_affected(self, group: click.Group, changed: set) -> bool:
+        return any(node.modules & changed for node in self._iter_nodes(group))
+
+    def _get_reusable(self, group: click.Group, changed: set) -> dict:
+        'get the nested groups which are not affected, `class -> (group, defaults from the parent)`.'
+        reusable = {}
+        for command in group.commands.values():
+            info = get_build_info(command)
+            if info is None or info.kind != BuildInfo.KIND_GROUP:
+                continue
+            if self._is_affected(command, changed):
+                reusable.update(self._get_reusable(command, changed))
+            else:
+                reusable[info.target] = (command, getattr(group, 'subcommand_defaults', None))
+        return reusable
+
+    def _rebuild(self, node: _Node, group: click.Group, changed: set):
+        info = node.info
+        new_cls = _resolve(sys.modules[info.target.__module__], info.target.__qualname__)
+        reusable = self._get_reusable(group, changed)
+
+        def reuse(cls, attrs: dict, parent_defaults):
+            # the class of a unchanged module is the same object after the reload
+            entry = reusable.get(cls)
+            if entry is not None and get_build_info(entry[0]).attrs == attrs and entry[1] == parent_defaults:
+                return entry[0]
+
+        new_group = info.rebuild(new_cls, reuse)
+        if node.parent is None:
+            # the root is held by caller, so update it inplace.
+            vars(group).update(vars(new_group))
+        else:
+            node.parent.add_command(new_group, node.name)
+
+    def _rebuild_affected(self, group: click.Group, changed: set, parent=None, name=None) -> list:
+        info = get_build_info(group)
+        if info is None or info.kind != BuildInfo.KIND_GROUP:
+            return []
+        node = _Node(group, info, parent, name)
+        if node.modules & changed:
+            self._rebuild(node, group, changed)
+            return [group]
+        rebuilt = []
+        for sub_name, command in list(group.commands.items()):
+            rebuilt.extend(self._rebuild_affected(command, changed, group, sub_name))
+        return rebuilt
+
+    def check(self) -> bool:
+        '''
+        reload if any module was changed, return whether any group was rebuilt.
+        '''
+        with self._lock:
+            changed = self.get_changed_modules()
+            if not changed:
+                return False
+            for module_name in changed:
+                importlib.reload(sys.modules[module_name])
+            rebuilt = self._rebuild_affected(self._app, changed)
+            self._snapshot()
+            return bool(rebuilt)
+
+    def _watch(self, interval: float):
+        while not self._stop_event.wait(interval):
+            try:
+                self.check()
+            except Exception as e: # keep watching, user may fix it later
+                click.echo(f'click_anno: unable to reload: {e!r}', err=True)
+
+    def start(self, interval: float = 1.0):
+        'start a daemon thread to watch the files.'
+        if self._thread is None:
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._watch, args=(interval, ), daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
@@ -5,14 +5,23 @@
 #
 # ----------
 
-import re
+_patterns = None
 
-first_cap_re = re.compile('(.)([A-Z][a-z]+)')
-all_cap_re = re.compile('([a-z0-9])([A-Z])')
+def _get_patterns():
+    'compile patterns on first use.'
+    global _patterns
+    if _patterns is None:
+        import re
+        _patterns = (
+            re.compile('(.)([A-Z][a-z]+)'), # first_cap_re
+            re.compile('([a-z0-9])([A-Z])'), # all_cap_re
+        )
+    return _patterns
 
 def convert(name):
     '''
     copy from `https://stackoverflow.com/questions/1175208/elegant-python-function-to-convert-camelcase-to-snake-case`
     '''
+    first_cap_re, all_cap_re = _get_patterns()
     s1 = first_cap_re.sub(r'\1_\2', name)
     return all_cap_re.sub(r'\1_\2', s1).lower()
@@ -5,8 +5,14 @@
 #
 # ----------
 
+import sys
+import bisect
+import collections.abc
+from array import array
 from enum import Enum
-from click import Choice, ParamType
+
+from click import Choice, ParamType, BadParameter, get_text_stream
+from click.types import convert_type
 
 
 class flag:
@@ -33,19 +39,331 @@ class _EnumChoice(Choice):
         enum_value = enum_value.replace('-', '_')
         return self._enum.__members__[enum_value]
 
+
+class _HashedChoice(Choice):
+    '''
+    a `Choice` which validate by a precomputed dict instead of the linear scan,
+    the value can be any hashable literal, e.g. `Literal[1, 2]`.
+    '''
+
+    def __init__(self, values: tuple, case_sensitive: bool = True, prefix: bool = False):
+        super().__init__(tuple(str(x) for x in values), case_sensitive)
+        self.values = values
+        self.prefix = prefix
+        self._values_set = frozenset(values)
+        self._map = {self._fold(str(x)): x for x in values}
+        if len(self._map) != len(values):
+            raise ValueError(f'choices {values!r} are not unique after case folding')
+        self._keys = sorted(self._map) if prefix else None
+        self._normed = {} # token_normalize_func -> map
+
+    def _fold(self, value: str) -> str:
+        return value if self.case_sensitive else value.casefold()
+
+    def _get_index(self, ctx) -> tuple:
+        'get `(map, sorted keys)` for the `token_normalize_func` of `ctx`.'
+        normalize = ctx.token_normalize_func if ctx is not None else None
+        if normalize is None:
+            return self._map, self._keys
+        index = self._normed.get(normalize)
+        if index is None:
+            normed = {self._fold(normalize(str(x))): x for x in self.values}
+            index = self._normed[normalize] = (normed, sorted(normed) if self.prefix else None)
+        return index
+
+    def convert(self, value, param, ctx):
+        try:
+            if value in self._values_set: # the default value
+                return value
+        except TypeError: # unable to hash
+            pass
+
+        normed_value = str(value)
+        if ctx is not None and ctx.token_normalize_func is not None:
+            normed_value = ctx.token_normalize_func(normed_value)
+        normed_value = self._fold(normed_value)
+        normed_map, keys = self._get_index(ctx)
+        try:
+            return normed_map[normed_value]
+        except KeyError:
+            pass
+
+        if self.prefix and normed_value:
+            # the keys which start with the prefix are adjacent in the sorted keys
+            start = bisect.bisect_left(keys, normed_value)
+            end = start
+            while end < len(keys) and keys[end].startswith(normed_value):
+                end += 1
+            if end - start == 1:
+                return normed_map[keys[start]]
+            if end - start > 1:
+                self.fail(f'ambiguous choice: {value}. (could be {", ".join(keys[start:end])})', param, ctx)
+
+        self.fail(f'invalid choice: {value}. (choose from {", ".join(self.choices)})', param, ctx)
+
+    def __repr__(self):
+        return f'choice{self.values!r}'
+
+
+_CHOICES = {}
+
+def choice(*values, case_sensitive: bool = True, prefix: bool = False) -> Choice:
+    '''
+    get a choice type of `values`:
+
+    ``` py
+    @command
+    def build(*, mode: choice('debug', 'release', case_sensitive=False, prefix=True) = 'debug'):
+        ...
+    ```
+
+    - `case_sensitive`: set to `False` to match the values by case folding;
+    - `prefix`: set to `True` to accept a unique prefix of a value, e.g. `rel` for `release`.
+
+    the instances are interned, so the same choices share one instance in all commands.
+    `typing.Literal[...]` or a `frozenset` (`set`) is same as `choice(...)`.
+    '''
+    if not values:
+        raise ValueError('values can not be empty')
+    key = (values, tuple(type(x) for x in values), bool(case_sensitive), bool(prefix))
+    param_type = _CHOICES.get(key)
+    if param_type is None:
+        param_type = _CHOICES.setdefault(key, _HashedChoice(values, bool(case_sensitive), bool(prefix)))
+    return param_type
+
+def get_choice_type(annotation):
+    '''
+    get the choice type from `typing.Literal[...]`, `frozenset` or `set`,
+    return `None` if the annotation is not a choices.
+    '''
+    if isinstance(annotation, (set, frozenset)):
+        if annotation:
+            return choice(*sorted(annotation, key=str))
+        return None
+    typing = sys.modules.get('typing') # a `Literal` means `typing` was imported
+    if typing is not None and getattr(annotation, '__origin__', None) is getattr(typing, 'Literal', _UNSET):
+        return choice(*annotation.__args__)
+
+
+class stream:
+    '''
+    represent a lazily read variadic parameter, the function will receive a iterator.
+
+    for each value from command line:
+
+    - `-` read items from stdin;
+    - `@path` read items from the file;
+    - otherwise the value is a item.
+
+    items are split by `delimiter` (newline or NUL for most case),
+    empty items are ignored.
+
+    `typing.Iterator[T]` and `typing.Iterable[T]` is same as `stream(T)`.
+    '''
+    __slots__ = ('item_type', 'delimiter')
+
+    def __init__(self, item_type: type = str, delimiter: str = '\n'):
+        if not delimiter:
+            raise ValueError('delimiter can not be empty')
+        self.item_type = item_type
+        self.delimiter = delimiter
+
+
+class params:
+    '''
+    represent a parameter object, the fields of the `dataclass` or `NamedTuple` are expanded into options:
+
+    ``` py
+    @command
+    def connect(db: params(Database, prefix='db')): # --db-host, --db-port, ...
+        ...
+    ```
+
+    `prefix` can be a str, or `True` to use the name of the parameter.
+    annotate with a `dataclass` or a `NamedTuple` is same as `params(T)`.
+    '''
+    __slots__ = ('type', 'prefix')
+
+    def __init__(self, type: type, prefix=None):
+        if not _is_params_type(type):
+            raise TypeError(f'{type!r} is not a dataclass or a NamedTuple')
+        self.type = type
+        self.prefix = prefix
+
+
+def _is_params_type(annotation) -> bool:
+    if not isinstance(annotation, type):
+        return False
+    if hasattr(annotation, '__dataclass_fields__'):
+        return True
+    return issubclass(annotation, tuple) and hasattr(annotation, '_fields')
+
+def get_params_type(annotation) -> params:
+    '''
+    get the `params` from the annotation, return `None` if the annotation is not a parameter object.
+    '''
+    if isinstance(annotation, params):
+        return annotation
+    if _is_params_type(annotation) and get_param_type(annotation) is None:
+        return params(annotation)
+
+
+class lazy_default:
+    '''
+    represent a default value which is costly to compute:
+
+    ``` py
+    @command
+    def checkout(branch: str = lazy_default(get_current_branch, ttl=60)):
+        ...
+    ```
+
+    `factory()` only be called when the value is missing from command line,
+    the result is cached in the process for `ttl` seconds (forever if `ttl` is `None`),
+    and the help text show `placeholder` instead of the value.
+    '''
+    __slots__ = ('_factory', 'ttl', 'type', 'placeholder', '_value', '_expires', '_lock')
+
+    def __init__(self, factory, ttl: float = None, type: type = None, placeholder: str = 'dynamic'):
+        if not callable(factory):
+            raise TypeError('factory must be callable')
+        import threading
+
+        self._factory = factory
+        self.ttl = ttl
+        self.type = type
+        self.placeholder = placeholder
+        self._value = _UNSET
+        self._expires = None
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        import time
+
+        with self._lock:
+            if self._value is _UNSET or (self._expires is not None and time.monotonic() >= self._expires):
+                self._value = self._factory()
+                if self.ttl is not None:
+                    self._expires = time.monotonic() + self.ttl
+            return self._value
+
+    def clear(self):
+        'drop the cached value.'
+        with self._lock:
+            self._value = _UNSET
+
+    def __repr__(self):
+        return f'<{self.placeholder}>'
+
+_UNSET = object()
+
+class CachedParamType(ParamType):
+    '''
+    a `ParamType` which memoize the converted values of the wrapped `param_type` by the raw string.
+
+    - `max_size`: the max number of the cached values, the least recently used one will be dropped;
+    - `ttl`: drop the cached value after the seconds;
+    - `check_mtime`: treat the raw value as a path, drop the cached value if the mtime of the file changed.
+
+    only the success conversions are cached, and the `param` and `ctx` are ignored for the cached values.
+    '''
+
+    def __init__(self, param_type: ParamType, max_size: int = 1024, ttl: float = None, check_mtime: bool = False):
+        import threading
+
+        self.param_type = param_type
+        self.name = param_type.name
+        self.is_composite = param_type.is_composite
+        self.envvar_list_splitter = param_type.envvar_list_splitter
+        self.max_size = max_size
+        self.ttl = ttl
+        self.check_mtime = check_mtime
+        self._entries = collections.OrderedDict() # raw value -> (converted value, expires, mtime)
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(('hits', 'misses', 'evictions'), 0)
+
+    def get_metavar(self, param):
+        return self.param_type.get_metavar(param)
+
+    def get_missing_message(self, param):
+        return self.param_type.get_missing_message(param)
+
+    def split_envvar_value(self, rv):
+        return self.param_type.split_envvar_value(rv)
+
+    @staticmethod
+    def _get_mtime(path: str):
+        import os
+        try:
+            return os.stat(path).st_mtime_ns
+        except (OSError, ValueError):
+            return None
+
+    def convert(self, value, param, ctx):
+        if not isinstance(value, str): # already converted, or unable to hash
+            return self.param_type.convert(value, param, ctx)
+
+        import time
+        now = time.monotonic()
+        mtime = self._get_mtime(value) if self.check_mtime else None
+        with self._lock:
+            entry = self._entries.get(value)
+            if entry is not None and (entry[1] is None or entry[1] > now) and entry[2] == mtime:
+                self._entries.move_to_end(value)
+                self._stats['hits'] += 1
+                return entry[0]
+            self._stats['misses'] += 1
+
+        converted = self.param_type.convert(value, param, ctx)
+        expires = None if self.ttl is None else now + self.ttl
+        with self._lock:
+            self._entries[value] = (converted, expires, mtime)
+            self._entries.move_to_end(value)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+        return converted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        '''
+        return the statistics: `hits`, `misses`, `evictions` and the current `size`.
+        '''
+        with self._lock:
+            return dict(self._stats, size=len(self._entries))
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.param_type!r})'
+
+
 _PARAM_TYPE_MAP = {}
 
-def register_param_type(annotation: type, param_type: ParamType):
+def register_param_type(annotation: type, param_type: ParamType, cache=None) -> ParamType:
     '''
     register a instance of `click.ParamType` for the annotation.
 
+    set `cache` to `True` (or a dict of the options of `CachedParamType`)
+    to memoize the converted values, useful for expensive conversions.
+
+    return the registered `ParamType`.
+
     **note: `annotation` must be a instance of `type`.**
     '''
     if not isinstance(annotation, type):
         raise TypeError
     if not isinstance(param_type, ParamType):
         raise TypeError
+    if cache is True:
+        param_type = CachedParamType(param_type)
+    elif isinstance(cache, dict):
+        param_type = CachedParamType(param_type, **cache)
+    elif cache not in (None, False):
+        raise TypeError(f'cache must be a bool or a dict, not {cache!r}')
     _PARAM_TYPE_MAP[annotation] = param_type
+    return param_type
 
 def get_param_type(annotation: type):
     '''
@@ -56,3 +374,157 @@ def get_param_type(annotation: type):
         return _PARAM_TYPE_MAP[annotation]
     except (TypeError, KeyError): # unable to hash
         pass
+
+
+class _ArrayConverter:
+    '''
+    the click callback which convert all raw values of a variadic parameter
+    into one contiguous buffer, without build a tuple of boxed values.
+    '''
+    __slots__ = ('_factory', '_item_type')
+
+    def __init__(self, factory, item_type: type):
+        self._factory = factory
+        self._item_type = item_type
+
+    def __call__(self, ctx, param, value):
+        value = value or ()
+        try:
+            return self._factory(value)
+        except (ValueError, TypeError, OverflowError) as error:
+            # slow path, find out the invalid value and report it like click.
+            item_param_type = convert_type(self._item_type)
+            for item in value:
+                item_param_type.convert(item, param, ctx)
+                try:
+                    self._factory((item, ))
+                except (ValueError, TypeError, OverflowError):
+                    raise BadParameter(f'{item} is out of range', ctx=ctx, param=param)
+            raise BadParameter(str(error), ctx=ctx, param=param)
+
+def _get_numpy_dtype(annotation):
+    numpy = sys.modules.get('numpy') # only if user already use numpy
+    if numpy is None:
+        return None
+    if getattr(annotation, '__origin__', None) is not numpy.ndarray:
+        return None
+    # for `numpy.typing.NDArray[numpy.float64]`,
+    # which is `numpy.ndarray[typing.Any, numpy.dtype[numpy.float64]]`
+    dtype = annotation.__args__[-1]
+    dtype = getattr(dtype, '__args__', (dtype, ))[0]
+    return numpy.dtype(dtype)
+
+def get_array_converter(annotation):
+    '''
+    try get a `_ArrayConverter` for a buffer annotation,
+    return `None` if the `annotation` is not a buffer.
+
+    supported annotations:
+
+    - instance of `array.array`, e.g. `array('d')`;
+    - `numpy.typing.NDArray[?]`, e.g. `NDArray[numpy.float64]`.
+    '''
+    if isinstance(annotation, array):
+        typecode = annotation.typecode
+        item_type = {'f': float, 'd': float, 'u': str}.get(typecode, int)
+        return _ArrayConverter(lambda values: array(typecode, map(item_type, values)), item_type)
+
+    dtype = _get_numpy_dtype(annotation)
+    if dtype is not None:
+        import numpy
+        item_type = {'f': float, 'i': int, 'u': int}.get(dtype.kind, str)
+        return _ArrayConverter(lambda values: numpy.array(values, dtype=dtype), item_type)
+
+
+_READ_SIZE = 1 << 16
+
+def _read_items(fp, delimiter: str):
+    if delimiter == '\n':
+        for line in fp:
+            line = line.rstrip('\r\n')
+            if line:
+                yield line
+        return
+
+    pending = ''
+    while True:
+        chunk = fp.read(_READ_SIZE)
+        if not chunk:
+            break
+        pending += chunk
+        *items, pending = pending.split(delimiter)
+        yield from filter(None, items)
+    if pending:
+        yield pending
+
+class _StreamReader:
+    '''
+    the click callback which lazily read the items of a variadic parameter.
+    '''
+    __slots__ = ('_stream', '_param_type')
+
+    def __init__(self, stream: stream):
+        self._stream = stream
+        self._param_type = None if stream.item_type is str else _get_item_param_type(stream.item_type)
+
+    def _iter_raw_items(self, values, param, ctx):
+        for value in values:
+            if value == '-':
+                yield from _read_items(get_text_stream('stdin'), self._stream.delimiter)
+            elif value[:1] == '@' and len(value) > 1:
+                path = value[1:]
+                try:
+                    fp = open(path, encoding='utf-8')
+                except OSError as e:
+                    raise BadParameter(f'unable to read {path}: {e.strerror}', ctx=ctx, param=param)
+                with fp:
+                    yield from _read_items(fp, self._stream.delimiter)
+            else:
+                yield value
+
+    @staticmethod
+    def _check_cancellation(items, ctx):
+        from .cancellation import get_cancellation_token
+
+        # the token is created when the command is invoked, after the arguments were parsed,
+        # so look it up on the first item.
+        token = None
+        for item in items:
+            if token is None:
+                token = get_cancellation_token(ctx, create=False) or False
+            if token:
+                token.raise_if_cancelled()
+            yield item
+
+    def _iter_items(self, values, param, ctx):
+        items = self._iter_raw_items(values, param, ctx)
+        param_type = self._param_type
+        if param_type is not None:
+            items = (param_type.convert(x, param, ctx) for x in items)
+        if ctx is not None:
+            items = self._check_cancellation(items, ctx)
+        return items
+
+    def __call__(self, ctx, param, value):
+        return self._iter_items(value or (), param, ctx)
+
+def _get_item_param_type(item_type) -> ParamType:
+    param_type = get_param_type(item_type)
+    if param_type is None:
+        if isinstance(item_type, type) and issubclass(item_type, Enum):
+            param_type = _EnumChoice(item_type)
+        else:
+            param_type = convert_type(item_type)
+    return param_type
+
+def get_stream_reader(annotation):
+    '''
+    try get a `_StreamReader` for a stream annotation,
+    return `None` if the `annotation` is not a stream.
+    '''
+    if not isinstance(annotation, stream):
+        if getattr(annotation, '__origin__', None) not in (collections.abc.Iterator, collections.abc.Iterable):
+            return None
+        item_type = annotation.__args__[0]
+        annotation = stream(item_type if isinstance(item_type, type) else str)
+    return _StreamReader(annotation)
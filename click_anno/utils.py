@@ -7,6 +7,18 @@
 
 _KEY_ATTRS = '__click_anno_attrs__'
 
+# attrs which handle by click_anno itself, they will not pass into click.
+ANNO_ATTRS = frozenset((
+    'output',
+    'reusable',
+    'cache',
+    'timeout',
+    'fast_parse',
+    'memory_budget',
+    'progress',
+    'watchdog',
+))
+
 def attrs(**kwargs):
     '''
     append attrs to command or group like:
@@ -17,7 +29,22 @@ def attrs(**kwargs):
     class ...
     ```
 
-    attrs will pass into `click` via `click.command(**attrs)(...)`.
+    attrs will pass into `click` via `click.command(**attrs)(...)`,
+    except the attrs which handle by click_anno.
+    on a group class, `output`, `cache`, `timeout`, `fast_parse`, `memory_budget`, `progress` and `watchdog`
+    are the defaults of its subcommands, which override the ones from `click_app(...)`:
+
+    - `output`: write the return value of the command to stdout,
+      one of `jsonl`, `json` or `tsv`.
+    - `reusable`: for group class, reuse the last instance
+      if it was created with the same arguments.
+    - `cache`: cache the result of the idempotent command,
+      `True`, a directory or a `click_anno.cache.ResultCache`.
+    - `timeout`: cancel the command after the seconds, also add a `--timeout` option.
+    - `fast_parse`: parse the arguments in one pass and fall back to click if unable to.
+    - `memory_budget`: the soft memory budget in bytes, see `click_anno.instrument`.
+    - `progress`: report the progress of the files and the streams, see `click_anno.progress`.
+    - `watchdog`: sample the stacks if the command runs longer than the seconds, see `click_anno.watchdog`.
     '''
     def wrapper(type_or_func):
         attrs: dict = get_attrs(type_or_func, False)
@@ -30,3 +57,29 @@ def attrs(**kwargs):
 def get_attrs(target, clone=True):
     attrs = getattr(target, _KEY_ATTRS, {})
     return attrs.copy() if clone else attrs
+
+
+def split_attrs(attrs: dict):
+    '''
+    split `attrs` into `(click_attrs, anno_attrs)`.
+    '''
+    click_attrs = {}
+    anno_attrs = {}
+    for key, value in attrs.items():
+        (anno_attrs if key in ANNO_ATTRS else click_attrs)[key] = value
+    return click_attrs, anno_attrs
+
+
+def load_target(spec: str):
+    '''
+    load object from `spec` like `package.module:attr`.
+    '''
+    import importlib
+
+    module_name, sep, qualname = spec.partition(':')
+    if not sep or not module_name or not qualname:
+        raise ValueError(f'target must be `module:attr`, not {spec!r}')
+    target = importlib.import_module(module_name)
+    for part in qualname.split('.'):
+        target = getattr(target, part)
+    return target
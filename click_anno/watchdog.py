@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+'''
+find out where the time went of the slow invocations, enable it by `attrs(watchdog=SECONDS)`
+or `click_app(watchdog=SECONDS)`.
+
+if a invocation runs longer than the threshold, a shared background thread samples the stack
+of the invoking thread, and the samples are written in the collapsed stack format (for flamegraph)
+into `CLICK_ANNO_INSTRUMENT_DIR` when the invocation ends.
+
+a fast invocation only arm and disarm the timer.
+'''
+
+import sys
+import time
+import threading
+import collections
+
+import click
+
+from . import instrument
+
+SAMPLE_INTERVAL = 0.01 # seconds
+
+
+class _Watch:
+    __slots__ = ('thread_id', 'interval', 'next_sample', 'samples')
+
+    def __init__(self, thread_id: int, threshold: float, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.next_sample = time.monotonic() + threshold
+        self.samples = collections.Counter() # collapsed stack -> count
+
+
+def _fold_stack(frame) -> str:
+    'fold the stack from `frame` as `root;...;leaf`.'
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        if code.co_filename != __file__:
+            names.append(f'{code.co_name} ({code.co_filename}:{code.co_firstlineno})')
+        frame = frame.f_back
+    names.reverse()
+    return ';'.join(names)
+
+
+class _Sampler:
+    '''
+    the background thread which sample the stacks of all armed watches after their deadline.
+    '''
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._watches = []
+        self._thread = threading.Thread(target=self._run, name='click_anno.watchdog', daemon=True)
+        self._thread.start()
+
+    def add(self, watch: _Watch):
+        with self._cond:
+            self._watches.append(watch)
+            self._cond.notify()
+
+    def remove(self, watch: _Watch):
+        with self._cond:
+            self._watches.remove(watch)
+
+    def _run(self):
+        with self._cond:
+            while True:
+                if not self._watches:
+                    self._cond.wait()
+                    continue
+                now = time.monotonic()
+                next_sample = min(x.next_sample for x in self._watches)
+                if next_sample > now:
+                    self._cond.wait(next_sample - now)
+                    continue
+                frames = sys._current_frames()
+                for watch in self._watches:
+                    if watch.next_sample <= now:
+                        frame = frames.get(watch.thread_id)
+                        if frame is not None:
+                            watch.samples[_fold_stack(frame)] += 1
+                        watch.next_sample = now + watch.interval
+                del frames # do not keep the frames alive
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+def _get_sampler() -> _Sampler:
+    global _sampler
+    if _sampler is None:
+        with _sampler_lock:
+            if _sampler is None:
+                _sampler = _Sampler()
+    return _sampler
+
+
+def write_collapsed(samples: dict, path: str):
+    'write the samples in the collapsed stack format, one `stack count` per line.'
+    with open(path, 'w', encoding='utf-8') as fp:
+        for stack, count in sorted(samples.items()):
+            fp.write(f'{stack} {count}\n')
+
+def run_watched(func, threshold: float, command_path: str, interval: float = SAMPLE_INTERVAL):
+    '''
+    call `func()` on the current thread, sample its stack if it runs longer than `threshold` seconds.
+    '''
+    sampler = _get_sampler()
+    watch = _Watch(threading.get_ident(), threshold, interval)
+    start = time.perf_counter()
+    sampler.add(watch)
+    try:
+        return func()
+    finally:
+        sampler.remove(watch)
+        if watch.samples:
+            elapsed = time.perf_counter() - start
+            path = instrument.make_result_path(command_path, '.collapsed')
+            write_collapsed(watch.samples, path)
+            instrument.emit('watchdog', command_path, path=path, elapsed=elapsed,
+                            samples=sum(watch.samples.values()))
+            click.echo(f'click_anno: {command_path} took {elapsed:.2f}s, '
+                       f'the sampled stacks were written to {path}', err=True)
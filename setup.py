@@ -34,6 +34,6 @@ setup(
     zip_safe=False,
     include_package_data=True,
     setup_requires=[],
-    install_requires=['click'],
+    install_requires=['click', 'importlib_metadata; python_version < "3.8"'],
     tests_require=[],
 )
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+import os
+
+import click
+from click.testing import CliRunner
+
+from click_anno import command, attrs, Invoker
+from click_anno.cache import ResultCache
+
+def test_cache(tmp_path):
+    calls = []
+
+    @command
+    @attrs(cache=str(tmp_path))
+    def func(x: int):
+        calls.append(x)
+        click.echo(f'x={x}')
+        return x * 2
+
+    for _ in range(2):
+        result = Invoker(func).invoke(['1'])
+        assert result.exit_code == 0
+        assert result.output == 'x=1\n'
+        assert result.return_value == 2
+    assert calls == [1]
+
+    result = CliRunner().invoke(func, ['2'])
+    assert result.output == 'x=2\n'
+    assert calls == [1, 2]
+
+    result = CliRunner().invoke(func, ['1', '--no-cache'])
+    assert result.output == 'x=1\n'
+    assert calls == [1, 2, 1]
+
+def test_cache_with_output_mode(tmp_path):
+    calls = []
+
+    @command
+    @attrs(cache=str(tmp_path), output='jsonl')
+    def func():
+        calls.append(1)
+        return iter([1, 2])
+
+    for _ in range(2):
+        result = CliRunner().invoke(func, [])
+        assert result.exit_code == 0
+        assert result.output == '1\n2\n'
+    assert calls == [1]
+
+def test_cache_file_params(tmp_path):
+    calls = []
+    data = tmp_path / 'data.txt'
+    data.write_text('a')
+
+    @command
+    @attrs(cache=ResultCache(str(tmp_path / 'cache'), file_params=('path', )))
+    def func(path):
+        calls.append(path)
+
+    CliRunner().invoke(func, [str(data)])
+    CliRunner().invoke(func, [str(data)])
+    assert len(calls) == 1
+
+    data.write_text('ab')
+    CliRunner().invoke(func, [str(data)])
+    assert len(calls) == 2
+
+def test_cache_eviction(tmp_path):
+    cache = ResultCache(str(tmp_path), max_size=300)
+    for i in range(10):
+        cache.store(str(i), 'x' * 100, b'')
+    assert sum(os.path.getsize(tmp_path / x) for x in os.listdir(tmp_path)) <= 300
+    assert cache.load('9') is not None
+    assert cache.load('0') is None
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+import asyncio
+
+import click
+from click.testing import CliRunner
+
+from click_anno import command, click_app, attrs, CancellationToken
+
+def test_timeout_sync():
+    @command
+    @attrs(timeout=0.05)
+    def func(token: CancellationToken):
+        token.wait(5)
+        token.raise_if_cancelled()
+
+    result = CliRunner().invoke(func, [])
+    assert result.exit_code == 124
+    assert 'timed out' in result.output
+
+def test_timeout_async():
+    @command
+    @attrs(timeout=0.05)
+    async def func():
+        await asyncio.sleep(5)
+
+    result = CliRunner().invoke(func, [])
+    assert result.exit_code == 124
+
+def test_timeout_option():
+    @command
+    @attrs(timeout=5)
+    def func(token: CancellationToken):
+        token.wait(0.2)
+        token.raise_if_cancelled()
+        click.echo('done')
+
+    result = CliRunner().invoke(func, [])
+    assert result.exit_code == 0
+    assert result.output == 'done\n'
+
+    result = CliRunner().invoke(func, ['--timeout', '0.05'])
+    assert result.exit_code == 124
+
+def test_async_command():
+    @command
+    async def func(x: int):
+        await asyncio.sleep(0)
+        click.echo(x)
+
+    result = CliRunner().invoke(func, ['1'])
+    assert result.exit_code == 0
+    assert result.output == '1\n'
+
+def test_group_timeout():
+    @click_app(timeout=0.05)
+    class App:
+        def run(self, token: CancellationToken):
+            token.wait(5)
+            token.raise_if_cancelled()
+
+    result = CliRunner().invoke(App, ['run'])
+    assert result.exit_code == 124
+
+def test_timeout_stream():
+    import time
+    import typing
+
+    consumed = []
+
+    @command
+    @attrs(timeout=0.1)
+    def func(items: typing.Iterator[str]):
+        for item in items:
+            consumed.append(item)
+            time.sleep(0.05)
+
+    result = CliRunner().invoke(func, [str(x) for x in range(10)])
+    assert result.exit_code == 124
+    assert len(consumed) < 10
@@ -126,3 +126,143 @@ def test_user_command():
     result = CliRunner().invoke(App, ['touch'])
     assert result.output.splitlines()[0] == "touch"
     assert result.exit_code == 0
+
+def test_group_instance_is_lazy():
+    @click_app
+    class App:
+        def __init__(self):
+            click.echo('init')
+
+        def method(self):
+            click.echo('method')
+
+        @staticmethod
+        def static():
+            click.echo('static')
+
+    result = CliRunner().invoke(App, ['static'])
+    assert result.exit_code == 0
+    assert result.output == "static\n"
+
+    result = CliRunner().invoke(App, ['method', '--help'])
+    assert result.exit_code == 0
+    assert 'init' not in result.output
+
+    result = CliRunner().invoke(App, ['method'])
+    assert result.exit_code == 0
+    assert result.output == "init\nmethod\n"
+
+def test_group_instance_reusable():
+    from click_anno import attrs
+
+    created = []
+
+    @click_app
+    @attrs(reusable=True)
+    class App:
+        def __init__(self, a):
+            created.append(a)
+
+        def method(self):
+            click.echo(str(len(created)))
+
+    for _ in range(3):
+        result = CliRunner().invoke(App, ['1', 'method'])
+        assert result.exit_code == 0
+    assert created == ['1']
+
+    result = CliRunner().invoke(App, ['2', 'method'])
+    assert result.exit_code == 0
+    assert created == ['1', '2']
+
+def test_group_instance_reusable_threads():
+    import time
+    import threading
+    from click_anno import attrs
+
+    created = []
+
+    @click_app
+    @attrs(reusable=True)
+    class App:
+        def __init__(self, a):
+            time.sleep(0.05) # let other threads miss the cache
+            created.append(a)
+
+        def method(self):
+            return id(self)
+
+    results = []
+    def invoke():
+        results.append(App.main(['1', 'method'], standalone_mode=False))
+    threads = [threading.Thread(target=invoke) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert created == ['1']
+    assert len(set(results)) == 1
+
+def test_help_with_prefix():
+    @click_app
+    class App:
+        def sync(self):
+            'sync files.'
+
+        def sync_all(self):
+            'sync all files.'
+
+        def push(self):
+            'push files.'
+
+    result = CliRunner().invoke(App, ['--help'])
+    assert result.exit_code == 0
+    assert result.output.splitlines()[-4:] == [
+        'Commands:',
+        '  push      push files.',
+        '  sync      sync files.',
+        '  sync-all  sync all files.',
+    ]
+
+    result = CliRunner().invoke(App, ['--help', 'sync'])
+    assert result.exit_code == 0
+    assert result.output.splitlines()[-3:] == [
+        'Commands:',
+        '  sync      sync files.',
+        '  sync-all  sync all files.',
+    ]
+
+    result = CliRunner().invoke(App, ['--help', 'x'])
+    assert result.exit_code == 0
+    assert result.output.splitlines()[-1] == "No commands starts with 'x'."
+
+def test_help_with_prefix_not_own():
+    @click_app
+    class App:
+        def __init__(self, name):
+            pass
+
+        def echo(self, *args):
+            click.echo(repr(args))
+
+        class Sub:
+            def sync(self):
+                'sync files.'
+
+            def push(self):
+                'push files.'
+
+    result = CliRunner().invoke(App, ['n', 'echo', '--', '--help', 'world'])
+    assert result.exit_code == 0
+    assert result.output == "('--help', 'world')\n"
+
+    result = CliRunner().invoke(App, ['n', 'sub', '--help', 'sy'])
+    assert result.exit_code == 0
+    assert result.output.splitlines()[-2:] == [
+        'Commands:',
+        '  sync  sync files.',
+    ]
+
+    result = CliRunner().invoke(App, ['n', '--help', 'ec'])
+    assert result.exit_code == 0
+    assert result.output.splitlines()[-1].split() == ['echo']
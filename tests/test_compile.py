@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+from enum import Enum, auto
+from typing import Tuple, Iterator, Literal
+
+import click
+from click.testing import CliRunner
+from pytest import raises
+
+from click_anno import attrs, flag
+from click_anno.compile import compile_source
+
+
+class Kind(Enum):
+    a = auto()
+    b = auto()
+
+
+class App:
+    'the app.'
+
+    def __init__(self, name, ctx: click.Context, *, verbose: flag = False):
+        self._name = name
+
+    def echo(self, value: int, kind: Kind = Kind.a, *, pos: Tuple[float, float] = (1.0, 2.0)):
+        'echo values.'
+        click.echo(f'{self._name} {value} {kind.name} {pos}')
+
+    alias = echo
+
+    @staticmethod
+    def count(ids: Iterator[int]):
+        click.echo(str(sum(ids)))
+
+    @attrs(output='jsonl')
+    def rows(self):
+        return [{'name': self._name}]
+
+    class Sub:
+        def __init__(self):
+            click.echo('sub init')
+
+        def run(self, *args):
+            click.echo(', '.join(args))
+
+
+def copy(src: tuple, dst, n=1):
+    'copy files.'
+    click.echo(f'{src} {dst} {n}')
+
+
+def build(mode: Literal['debug', 'release'], *, level: Literal[1, 2] = 1):
+    click.echo(f'{mode} {level!r}')
+
+
+def _exec(source):
+    namespace = {'__name__': 'compiled'}
+    exec(compile(source, 'compiled', 'exec'), namespace)
+    return namespace['cli']
+
+
+def test_compile_command():
+    cli = _exec(compile_source(copy))
+
+    result = CliRunner().invoke(cli, ['a', 'b', 'c', '--n', '2'])
+    assert result.exit_code == 0
+    assert result.output == "('a', 'b') c 2\n"
+
+def test_compile_choice():
+    cli = _exec(compile_source(build))
+
+    result = CliRunner().invoke(cli, ['release', '--level', '2'])
+    assert result.exit_code == 0
+    assert result.output == "release 2\n"
+
+def test_compile_app():
+    source = compile_source(App)
+    assert 'click_anno.core' not in source
+    cli = _exec(source)
+
+    result = CliRunner().invoke(cli, ['x', 'echo', '1', '--kind', 'b'])
+    assert result.exit_code == 0
+    assert result.output == "x 1 b (1.0, 2.0)\n"
+
+    result = CliRunner().invoke(cli, ['x', 'alias', '2'])
+    assert result.exit_code == 0
+    assert result.output == "x 2 a (1.0, 2.0)\n"
+
+    result = CliRunner().invoke(cli, ['x', 'count', '1', '2'])
+    assert result.exit_code == 0
+    assert result.output == "3\n"
+
+    result = CliRunner().invoke(cli, ['x', 'rows'])
+    assert result.exit_code == 0
+    assert result.output == '{"name":"x"}\n'
+
+    result = CliRunner().invoke(cli, ['x', 'sub', 'run', 'a', 'b'])
+    assert result.exit_code == 0
+    assert result.output == "sub init\na, b\n"
+
+def test_compile_local_class():
+    class Local:
+        def method(self):
+            pass
+
+    with raises(ValueError, match='not importable'):
+        compile_source(Local)
+
+class Tools:
+    def run(self):
+        pass
+
+
+def test_compile_unsupported_options():
+    for key, value in (('progress', True), ('watchdog', 1.0), ('memory_budget', 10), ('timeout', 3),
+                       ('cache', True)):
+        with raises(ValueError, match=f'unable to compile .* with attrs .*{key}'):
+            compile_source(Tools, **{key: value})
+
+_SENTINEL = object()
+
+def run(value=_SENTINEL):
+    pass
+
+def test_compile_unsupported_default():
+    with raises(ValueError, match="unable to compile the default value .* of parameter 'value'"):
+        compile_source(run)
+
+def test_verify_help():
+    from click_anno import command
+    from click_anno.compile import verify
+
+    def hello(name):
+        'say hello.'
+    dynamic = command(hello)
+
+    def hello(name):
+        'say goodbye.'
+    compiled = command(hello)
+
+    with raises(ValueError, match=r"--help of compiled command 'hello' is different:(.|\n)*\+  say goodbye\."):
+        verify(dynamic, compiled)
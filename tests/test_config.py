@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+import os
+import json
+
+import click
+import pytest
+from click.testing import CliRunner
+
+from click_anno import click_app, flag
+from click_anno import config as config_module
+
+
+class App:
+    def __init__(self, *, verbose: flag = False):
+        self._verbose = verbose
+
+    def greet(self, *, name='Guest', dry_run: flag = False):
+        click.echo(f'{self._verbose} {name} {dry_run}')
+
+    class Remote:
+        def add(self, *, fetch: flag = False):
+            click.echo(f'fetch {fetch}')
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path, monkeypatch):
+    path = tmp_path / 'cache'
+    monkeypatch.setenv('XDG_CACHE_HOME', str(path))
+    return path
+
+
+def test_config_layers(tmp_path):
+    user = tmp_path / 'user.json'
+    project = tmp_path / 'project.toml'
+    user.write_text(json.dumps({'verbose': True, 'greet': {'name': 'Peter', 'dry-run': True}}))
+    project.write_text('[greet]\nname = "Mary"\n\n[remote.add]\nfetch = true\n')
+    app = click_app(App, config=[str(tmp_path / 'system.json'), str(user), str(project)])
+
+    result = CliRunner().invoke(app, ['greet'])
+    assert result.exit_code == 0
+    assert result.output == 'True Mary True\n'
+
+    result = CliRunner().invoke(app, ['greet', '--name', 'Tom'])
+    assert result.output == 'True Tom True\n'
+
+    result = CliRunner().invoke(app, ['remote', 'add'])
+    assert result.output == 'fetch True\n'
+
+def test_config_ini(tmp_path):
+    path = tmp_path / 'setup.cfg'
+    path.write_text('[flake8]\nmax-line-length = 100\n\n[app.greet]\nname = Peter\n')
+    app = click_app(App, config=str(path))
+
+    result = CliRunner().invoke(app, ['greet'])
+    assert result.exit_code == 0
+    assert result.output == 'False Peter False\n'
+
+def test_config_reparse_changed_only(tmp_path, monkeypatch):
+    path = tmp_path / 'app.json'
+    path.write_text(json.dumps({'greet': {'name': 'Peter'}}))
+    app = click_app(App, config=str(path))
+
+    calls = []
+    parse = config_module._PARSERS['json']
+    monkeypatch.setitem(config_module._PARSERS, 'json', lambda p: calls.append(p) or parse(p))
+    for _ in range(3):
+        result = CliRunner().invoke(app, ['greet'])
+        assert result.output == 'False Peter False\n'
+    assert len(calls) == 1
+
+    path.write_text(json.dumps({'greet': {'name': 'Mary'}}))
+    os.utime(str(path), ns=(0, 0))
+    result = CliRunner().invoke(app, ['greet'])
+    assert result.output == 'False Mary False\n'
+    assert len(calls) == 2
+
+def test_config_unknown_option(tmp_path):
+    path = tmp_path / 'app.json'
+    path.write_text(json.dumps({'greet': {'age': 1}}))
+    app = click_app(App, config=str(path))
+
+    result = CliRunner().invoke(app, ['greet'])
+    assert result.exit_code == 1
+    assert "unknown option 'age' of app greet" in result.output
+
+def test_config_stored_on_disk(tmp_path, monkeypatch, cache_home):
+    path = tmp_path / 'app.json'
+    path.write_text(json.dumps({'greet': {'name': 'Peter'}}))
+
+    calls = []
+    parse = config_module._PARSERS['json']
+    monkeypatch.setitem(config_module._PARSERS, 'json', lambda p: calls.append(p) or parse(p))
+    for _ in range(2):
+        # as a new process
+        monkeypatch.setattr(config_module, '_PARSED', {})
+        result = CliRunner().invoke(click_app(App, config=str(path)), ['greet'])
+        assert result.output == 'False Peter False\n'
+    assert len(calls) == 1
+    assert len(list((cache_home / 'click_anno' / 'config').iterdir())) == 1
+
+    path.write_text(json.dumps({'greet': {'name': 'Mary'}}))
+    os.utime(str(path), ns=(0, 0))
+    monkeypatch.setattr(config_module, '_PARSED', {})
+    result = CliRunner().invoke(click_app(App, config=str(path)), ['greet'])
+    assert result.output == 'False Mary False\n'
+    assert len(calls) == 2
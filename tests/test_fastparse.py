@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+from enum import Enum
+
+import click
+import pytest
+from click.testing import CliRunner
+
+from click_anno import command, attrs, flag
+from click_anno.fastparse import FastCommand
+
+class Color(Enum):
+    red = 1
+    dark_blue = 2
+
+def _make(fast: bool):
+    def func(name: str, count: int, *, ratio: float = 0.5, color: Color = Color.red, verbose: flag = False):
+        click.echo(repr((name, count, ratio, color, verbose)))
+    if fast:
+        func = attrs(fast_parse=True)(func)
+    return command(func)
+
+ARGS_LIST = [
+    ['a', '1'],
+    ['a', '1', '--ratio', '2.5', '--color', 'dark-blue', '--verbose'],
+    ['--ratio=1', 'a', '--verbose', '1'],
+    ['-', '1', '--ratio', '1', '--ratio', '2'],
+    ['a', '1', '--', '-x'],
+    ['a', '1', '--help'],
+    # errors
+    [],
+    ['a'],
+    ['a', 'x'],
+    ['a', '1', '2'],
+    ['a', '1', '--ratio'],
+    ['a', '1', '--ratio', 'x'],
+    ['a', '1', '--color', 'green'],
+    ['a', '1', '--unknown'],
+    ['a', '1', '--verbose=1'],
+    ['a', '-1'],
+]
+
+@pytest.mark.parametrize('args', ARGS_LIST)
+def test_same_as_click(args):
+    fast = _make(True)
+    assert isinstance(fast, FastCommand)
+    expected = CliRunner().invoke(_make(False), args)
+    result = CliRunner().invoke(fast, args)
+    assert result.output == expected.output
+    assert result.exit_code == expected.exit_code
+
+def test_fast_path_used(monkeypatch):
+    fast = _make(True)
+
+    def make_parser(self, ctx):
+        raise AssertionError('should not use the parser of click')
+    monkeypatch.setattr(click.Command, 'make_parser', make_parser)
+
+    result = CliRunner().invoke(fast, ['a', '1', '--color', 'dark-blue', '--verbose'])
+    assert result.exit_code == 0
+    assert result.output == "('a', 1, 0.5, <Color.dark_blue: 2>, True)\n"
+
+def test_unsupported_params():
+    @command
+    @attrs(fast_parse=True)
+    def func(*names):
+        pass
+
+    assert func._parse_plan is None
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+import os
+import sys
+import subprocess
+
+import click_anno
+
+# budget of `import click_anno`, in microseconds.
+IMPORT_TIME_BUDGET = 10_000
+
+def _run_python(*args):
+    env = os.environ.copy()
+    env['PYTHONPATH'] = os.path.dirname(os.path.dirname(click_anno.__file__))
+    return subprocess.run([sys.executable, *args], env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+
+def _get_imported_modules(code: str) -> set:
+    proc = _run_python('-c', f'{code}\nimport sys\nprint("\\n".join(sys.modules))')
+    return set(proc.stdout.splitlines())
+
+def test_import_time():
+    proc = _run_python('-X', 'importtime', '-c', 'import click_anno')
+    times = {}
+    for line in proc.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, name = line.split('|')
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+
+    assert 'click_anno.core' not in times
+    assert 'click' not in times
+    assert times['click_anno'] < IMPORT_TIME_BUDGET
+
+def test_core_does_not_import_heavy_modules():
+    modules = _get_imported_modules('import click_anno.core') - _get_imported_modules('import click')
+    assert not modules & {'typing', 'json', 'orjson', 'click_anno.output'}
+
+def test_lazy_attrs():
+    for name in click_anno.__all__:
+        assert getattr(click_anno, name) is not None
+    assert set(click_anno.__all__) <= set(dir(click_anno))
+
+def test_core_annotations_resolvable():
+    import typing
+    from click_anno import core
+
+    # the annotations are not evaluated at import time, but they must still be resolvable.
+    for func in (core.anno, core.get_build_info, core.GroupBuilderOptions.find_origin_name,
+                 core._Group.get_help_entry):
+        typing.get_type_hints(func)
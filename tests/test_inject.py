@@ -39,3 +39,196 @@ def test_inject():
     result = CliRunner().invoke(func, [])
     assert result.output == "Custom\n"
     assert result.exit_code == 0
+
+
+def test_inject_pool():
+    import sqlite3
+    from click_anno import inject_pool, click_app
+
+    class Conn:
+        pass
+
+    pool = inject_pool(Conn, lambda: sqlite3.connect(':memory:'), max_size=2,
+                       validate=lambda c: c.execute('select 1').fetchone() == (1, ))
+
+    @click_app
+    class App:
+        def __init__(self, conn: Conn):
+            self.conn = conn
+
+        def run(self, conn: Conn):
+            assert conn is self.conn
+            echo(conn.execute('select 1 + 1').fetchone()[0])
+
+    for _ in range(3):
+        result = CliRunner().invoke(App, ['run'])
+        assert result.exit_code == 0
+        assert result.output == "2\n"
+
+    stats = pool.stats()
+    assert stats['created'] == 1
+    assert stats['reused'] == 2
+    assert stats['in_use'] == 0
+    assert stats['idle'] == 1
+
+
+def test_resource_pool():
+    import pytest
+    from click_anno.pool import ResourcePool
+
+    closed = []
+    pool = ResourcePool(object, max_size=1, validate=lambda x: x not in closed, idle_timeout=0,
+                        close=closed.append)
+    a = pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.01)
+    pool.release(a)
+    b = pool.acquire() # the idle one was evicted
+    assert b is not a
+    assert closed == [a]
+    pool.release(b, discard=True)
+    assert pool.stats() == {
+        'created': 2, 'reused': 0, 'discarded': 1, 'evicted': 1, 'waited': 1, 'in_use': 0, 'idle': 0
+    }
+
+
+def test_inject_generator():
+    events = []
+
+    class Session:
+        pass
+
+    def create_session():
+        events.append('open')
+        yield Session()
+        events.append('close')
+
+    inject(Session, create_session)
+
+    @command
+    def func(s: Session):
+        assert isinstance(s, Session)
+        events.append('run')
+
+    result = CliRunner().invoke(func, [])
+    assert result.exit_code == 0
+    assert events == ['open', 'run', 'close']
+
+
+def test_inject_context_manager(tmp_path):
+    import tempfile
+
+    class Workdir:
+        pass
+
+    inject(Workdir, lambda: tempfile.TemporaryDirectory(dir=str(tmp_path)), enter_context=True)
+
+    paths = []
+
+    @command
+    def func(path: Workdir):
+        assert isinstance(path, str)
+        paths.append(path)
+
+    result = CliRunner().invoke(func, [])
+    assert result.exit_code == 0
+    assert len(paths) == 1
+    assert list(tmp_path.iterdir()) == [] # removed
+
+
+def test_inject_injectable_generator():
+    events = []
+
+    class Session(Injectable):
+        @classmethod
+        def __inject__(cls):
+            events.append('open')
+            yield cls()
+            events.append('close')
+
+    @command
+    def func(s: Session):
+        assert isinstance(s, Session)
+        events.append('run')
+
+    result = CliRunner().invoke(func, [])
+    assert result.exit_code == 0
+    assert events == ['open', 'run', 'close']
+
+
+def test_inject_shared_context_manager():
+    import io
+
+    class Shared(io.StringIO):
+        pass
+
+    shared = Shared()
+    inject(Shared, lambda: shared)
+
+    @command
+    def func(s: Shared):
+        s.write('x')
+
+    for _ in range(2):
+        result = CliRunner().invoke(func, [])
+        assert result.exit_code == 0
+    assert shared.getvalue() == 'xx' # not closed
+
+
+def test_inject_contextmanager_factory():
+    import contextlib
+
+    events = []
+
+    class Conn:
+        pass
+
+    @contextlib.contextmanager
+    def connect():
+        events.append('open')
+        yield Conn()
+        events.append('close')
+
+    inject(Conn, connect)
+
+    @command
+    def func(c: Conn):
+        assert isinstance(c, Conn)
+        events.append('run')
+
+    result = CliRunner().invoke(func, [])
+    assert result.exit_code == 0
+    assert events == ['open', 'run', 'close']
+
+
+def test_inject_generator_sees_exception():
+    events = []
+
+    class Transaction:
+        pass
+
+    def begin():
+        try:
+            yield Transaction()
+        except ValueError as e:
+            events.append(f'rollback {e}')
+            raise
+        else:
+            events.append('commit')
+
+    inject(Transaction, begin)
+
+    from click_anno import flag
+
+    @command
+    def func(t: Transaction, fail: flag = False):
+        if fail:
+            raise ValueError('oops')
+
+    result = CliRunner().invoke(func, [])
+    assert result.exit_code == 0
+    assert events == ['commit']
+
+    result = CliRunner().invoke(func, ['--fail'])
+    assert isinstance(result.exception, ValueError)
+    assert events == ['commit', 'rollback oops']
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+import pstats
+
+import click
+from click.testing import CliRunner
+
+from click_anno import click_app, command
+from click_anno import instrument
+
+
+class App:
+    def __init__(self):
+        pass
+
+    def run(self):
+        click.echo('ran')
+
+
+def test_profile_body(tmp_path, monkeypatch):
+    monkeypatch.setenv('CLICK_ANNO_PROFILE', 'body')
+    monkeypatch.setenv('CLICK_ANNO_INSTRUMENT_DIR', str(tmp_path))
+
+    events = []
+    instrument.add_listener(events.append)
+    try:
+        result = CliRunner().invoke(click_app(App), ['run'])
+    finally:
+        instrument.remove_listener(events.append)
+    assert result.exit_code == 0
+    assert result.output == 'ran\n'
+
+    files = list(tmp_path.iterdir())
+    assert len(files) == 1
+    assert files[0].name.startswith('app.run-')
+    assert files[0].suffix == '.pstats'
+    pstats.Stats(str(files[0])) # readable
+    assert [(x['event'], x['command'], x['path']) for x in events] == [('profile', 'app run', str(files[0]))]
+
+
+def test_profile_invocation_with_option(tmp_path, monkeypatch):
+    monkeypatch.delenv('CLICK_ANNO_PROFILE', raising=False)
+    monkeypatch.setenv('CLICK_ANNO_INSTRUMENT_DIR', str(tmp_path))
+
+    app = click_app(App, profile_option=True)
+    assert '--click-anno-profile' not in CliRunner().invoke(app, ['--help']).output
+
+    CliRunner().invoke(app, ['run'])
+    assert list(tmp_path.iterdir()) == []
+
+    result = CliRunner().invoke(app, ['--click-anno-profile', 'invocation', 'run'])
+    assert result.exit_code == 0
+    files = list(tmp_path.iterdir())
+    assert len(files) == 1
+    assert files[0].name.startswith('app.run-')
+    functions = {x[2] for x in pstats.Stats(str(files[0])).stats}
+    assert '__init__' in functions
+
+
+def test_profile_sampling(tmp_path, monkeypatch):
+    monkeypatch.setenv('CLICK_ANNO_PROFILE', '1')
+    monkeypatch.setenv('CLICK_ANNO_PROFILE_SAMPLE', '3')
+    monkeypatch.setenv('CLICK_ANNO_INSTRUMENT_DIR', str(tmp_path))
+
+    @command
+    def func():
+        pass
+
+    for _ in range(6):
+        CliRunner().invoke(func, [])
+    assert len(list(tmp_path.iterdir())) == 2
+
+    monkeypatch.setenv('CLICK_ANNO_PROFILE_MIN_MS', '10000')
+    for _ in range(6):
+        CliRunner().invoke(func, [])
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_memory_report(tmp_path, monkeypatch):
+    import json
+    import tracemalloc
+
+    monkeypatch.delenv('CLICK_ANNO_PROFILE', raising=False)
+    monkeypatch.setenv('CLICK_ANNO_MEMORY', '1')
+    monkeypatch.setenv('CLICK_ANNO_INSTRUMENT_DIR', str(tmp_path))
+
+    retained = []
+
+    @command
+    def func(ctx: click.Context):
+        retained.append(bytearray(1024 * 1024))
+
+    result = CliRunner().invoke(func, [])
+    assert result.exit_code == 0
+    assert not tracemalloc.is_tracing() # stopped
+
+    files = list(tmp_path.iterdir())
+    assert len(files) == 1
+    assert files[0].name.endswith('.memory.json')
+    report = json.loads(files[0].read_text())
+    assert report['command'] == 'func'
+    assert report['peak'] >= 1024 * 1024
+    assert report['retained'] >= 1024 * 1024
+    assert 'injected' in report['marks']
+    assert report['top'][0]['size_diff'] >= 1024 * 1024
+    assert report['top'][0]['traceback'][-1].startswith(__file__)
+
+
+def test_memory_peak_without_reset(tmp_path, monkeypatch):
+    import json
+    import tracemalloc
+
+    monkeypatch.delenv('CLICK_ANNO_PROFILE', raising=False)
+    monkeypatch.setenv('CLICK_ANNO_MEMORY', '1')
+    monkeypatch.setenv('CLICK_ANNO_INSTRUMENT_DIR', str(tmp_path))
+    monkeypatch.delattr(tracemalloc, 'reset_peak', raising=False) # as python 3.8
+
+    @command
+    def func():
+        pass
+
+    tracemalloc.start()
+    try:
+        bytearray(1024 * 1024) # the peak before the invocation
+        result = CliRunner().invoke(func, [])
+    finally:
+        tracemalloc.stop()
+    assert result.exit_code == 0
+    report = json.loads(next(tmp_path.iterdir()).read_text())
+    assert report['peak'] is None
+
+def test_memory_budget(monkeypatch):
+    from click_anno import attrs
+
+    monkeypatch.delenv('CLICK_ANNO_PROFILE', raising=False)
+    monkeypatch.delenv('CLICK_ANNO_MEMORY', raising=False)
+
+    @command
+    @attrs(memory_budget=1024)
+    def func():
+        bytearray(1024 * 1024)
+
+    result = CliRunner(mix_stderr=False).invoke(func, [])
+    assert result.exit_code == 0
+    assert 'exceeds the memory budget 1024 bytes' in result.stderr
+
+    monkeypatch.setenv('CLICK_ANNO_MEMORY_BUDGET_ACTION', 'abort')
+    result = CliRunner(mix_stderr=False).invoke(func, [])
+    assert result.exit_code == 1
+    assert 'exceeds the memory budget 1024 bytes' in result.stderr
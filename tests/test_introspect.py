@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+import json
+import tracemalloc
+
+import click
+from click.testing import CliRunner
+
+from click_anno import click_app, describe, attrs
+from click_anno.introspect import format_tree, main
+
+
+class App:
+    def __init__(self, ctx: click.Context, *, verbose: bool = False):
+        pass
+
+    def run(self, name: str, count: int = 1):
+        'run it'
+        pass
+
+    r = run
+
+    class Sub:
+        @attrs(output='json')
+        def list(self):
+            return []
+
+
+built_app = click_app(App)
+
+
+def test_describe():
+    tracemalloc.start()
+    try:
+        app = click_app(App)
+    finally:
+        tracemalloc.stop()
+    node = describe(app)
+    json.dumps(node) # jsonable
+
+    assert node['name'] == 'app'
+    assert node['kind'] == 'group'
+    assert node['source']['file'] == __file__
+    assert node['injected'] == [{'name': 'ctx', 'injector': '_CallableInjector'}]
+    assert node['build_time'] > 0
+    assert node['build_memory'] is not None
+    assert node['build_self_time'] <= node['build_time']
+
+    run, sub = node['commands']
+    assert run['name'] == 'run'
+    assert run['kind'] == 'method'
+    assert run['aliases'] == ['r']
+    assert run['help'] == 'run it (alias: r)'
+    assert [(x['name'], x['kind'], x['required']) for x in run['params']] == [
+        ('name', 'argument', True), ('count', 'option', False)
+    ]
+    assert sub['commands'][0]['anno_attrs'] == {'output': 'json'}
+
+    text = format_tree(node)
+    assert 'run [method]' in text
+    assert '(aliases: r)' in text
+    assert '- --count: option integer default=1' in text
+
+
+def test_main():
+    result = CliRunner().invoke(main, ['tests.test_introspect:built_app', '--format', 'json'])
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output)['kind'] == 'group'
+
+    result = CliRunner().invoke(main, ['tests.test_introspect:built_app'])
+    assert result.exit_code == 0, result.output
+    assert result.output.startswith('app [group]')
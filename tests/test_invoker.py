@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+import click
+
+from click_anno import Invoker, click_app, command
+
+def test_invoke_return_value_and_output():
+    @click_app
+    class App:
+        def method(self, x: int):
+            click.echo(f'x={x}')
+            return x * 2
+
+    invoker = Invoker(App)
+    for i in range(3):
+        result = invoker.invoke(['method', str(i)])
+        assert result.exit_code == 0
+        assert result.exception is None
+        assert result.output == f'x={i}\n'
+        assert result.return_value == i * 2
+
+def test_invoke_usage_error():
+    @command
+    def func(x: int):
+        pass
+
+    result = Invoker(func).invoke(['a'])
+    assert result.exit_code == 2
+    assert result.output == ''
+    assert 'is not a valid integer' in result.stderr
+
+def test_invoke_help():
+    @command
+    def func(x: int):
+        'the doc.'
+
+    result = Invoker(func).invoke(['--help'])
+    assert result.exit_code == 0
+    assert 'the doc.' in result.output
+
+def test_invoke_exception():
+    @command
+    def func():
+        raise KeyError('k')
+
+    result = Invoker(func).invoke([])
+    assert result.exit_code == 1
+    assert isinstance(result.exception, KeyError)
+
+def test_invoke_context_settings():
+    @command
+    def func(ctx: click.Context):
+        click.echo(ctx.obj)
+
+    invoker = Invoker(func, obj='a')
+    assert invoker.invoke([]).output == 'a\n'
+    assert invoker.invoke([], obj='b').output == 'b\n'
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+import json
+
+import click
+from click.testing import CliRunner
+
+from click_anno import command, click_app, attrs
+
+def test_output_jsonl():
+    @command
+    @attrs(output='jsonl')
+    def func(n: int):
+        return ({'i': i} for i in range(n))
+
+    result = CliRunner().invoke(func, ['3'])
+    assert result.exit_code == 0
+    assert [json.loads(x) for x in result.output.splitlines()] == [{'i': 0}, {'i': 1}, {'i': 2}]
+
+def test_output_json():
+    @command
+    @attrs(output='json')
+    def func(n: int):
+        return range(n)
+
+    result = CliRunner().invoke(func, ['3'])
+    assert result.exit_code == 0
+    assert json.loads(result.output) == [0, 1, 2]
+
+    result = CliRunner().invoke(func, ['0'])
+    assert result.exit_code == 0
+    assert json.loads(result.output) == []
+
+def test_output_json_single_value():
+    @command
+    @attrs(output='json')
+    def func():
+        return {'a': 1}
+
+    result = CliRunner().invoke(func, [])
+    assert result.exit_code == 0
+    assert json.loads(result.output) == {'a': 1}
+
+def test_output_tsv():
+    @command
+    @attrs(output='tsv')
+    def func():
+        yield {'name': 'a\tb', 'value': 1}
+        yield {'name': 'c', 'value': None}
+
+    result = CliRunner().invoke(func, [])
+    assert result.exit_code == 0
+    assert result.output == 'name\tvalue\na\\tb\t1\nc\t\n'
+
+def test_output_keep_order_with_echo():
+    @command
+    @attrs(output='jsonl')
+    def func():
+        click.echo('header')
+        return [1]
+
+    result = CliRunner().invoke(func, [])
+    assert result.exit_code == 0
+    assert result.output == 'header\n1\n'
+
+def test_output_from_click_app():
+    @click_app(output='jsonl')
+    class App:
+        def items(self):
+            return [[1, 2]]
+
+        @attrs(output='tsv')
+        def rows(self):
+            return [[1, 2]]
+
+    result = CliRunner().invoke(App, ['items'])
+    assert result.exit_code == 0
+    assert result.output == '[1,2]\n'
+
+    result = CliRunner().invoke(App, ['rows'])
+    assert result.exit_code == 0
+    assert result.output == '1\t2\n'
+
+def test_output_unknown_format():
+    import pytest
+
+    with pytest.raises(ValueError):
+        @command
+        @attrs(output='xml')
+        def func():
+            pass
+
+def test_output_group_attrs():
+    @attrs(output='jsonl')
+    class App:
+        def rows(self):
+            return [{'a': 1}]
+
+        @attrs(output='tsv')
+        def table(self):
+            return [{'a': 1}]
+
+        class Sub:
+            def rows(self):
+                return [{'b': 2}]
+
+    app = click_app(App)
+    result = CliRunner().invoke(app, ['rows'])
+    assert result.output == '{"a":1}\n'
+    result = CliRunner().invoke(app, ['table'])
+    assert result.output == 'a\n1\n'
+    result = CliRunner().invoke(app, ['sub', 'rows'])
+    assert result.output == '{"b":2}\n'
@@ -156,3 +156,79 @@ def test_kwarg_name():
     result = CliRunner().invoke(func, ['--name', 'Peter'])
     assert result.exit_code == 0
     assert result.output == 'Hello Peter!\n'
+
+def test_params_dataclass():
+    from dataclasses import dataclass, field
+    from enum import Enum
+    from click_anno import params, flag
+
+    class Mode(Enum):
+        fast = 1
+        safe = 2
+
+    @dataclass
+    class Database:
+        host: str
+        port: int = 5432
+        mode: Mode = Mode.safe
+        readonly: flag = False
+        tags: list = field(default_factory=list)
+
+    @command
+    def func(name, db: Database, *, backup: params(Database, prefix='backup')):
+        assert isinstance(db, Database)
+        click.echo(f'{name} {db.host}:{db.port} {db.mode.name} {db.readonly} {db.tags}')
+        click.echo(f'{backup.host}:{backup.port}')
+
+    result = CliRunner().invoke(func, ['x', '--host', 'h', '--mode', 'fast', '--readonly',
+                                       '--backup-host', 'b', '--backup-port', '1'])
+    assert result.exit_code == 0, result.output
+    assert result.output == 'x h:5432 fast True []\nb:1\n'
+
+    result = CliRunner().invoke(func, ['x', '--backup-host', 'b'])
+    assert result.exit_code == 2
+    assert "Missing option '--host'" in result.output
+
+def test_params_namedtuple():
+    from typing import NamedTuple
+    from click_anno.fields import get_fields
+
+    class Point(NamedTuple):
+        x: int
+        y: int = 0
+
+    @command
+    def func(p: Point):
+        assert isinstance(p, Point)
+        click.echo(repr(tuple(p)))
+
+    result = CliRunner().invoke(func, ['--x', '1'])
+    assert result.exit_code == 0, result.output
+    assert result.output == '(1, 0)\n'
+
+    assert get_fields(Point) is get_fields(Point) # cached
+
+def test_params_default_instance():
+    from dataclasses import dataclass
+    from pytest import raises
+
+    @dataclass
+    class Database:
+        host: str
+        port: int = 5432
+
+    @command
+    def func(db: Database = Database('localhost', 1)):
+        click.echo(f'{db.host}:{db.port}')
+
+    result = CliRunner().invoke(func, [])
+    assert result.exit_code == 0, result.output
+    assert result.output == 'localhost:1\n'
+
+    result = CliRunner().invoke(func, ['--port', '2'])
+    assert result.output == 'localhost:2\n'
+
+    with raises(ValueError):
+        @command
+        def func(db: Database = None):
+            pass
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+import sys
+import textwrap
+
+from click.testing import CliRunner
+
+from click_anno import click_app
+from click_anno.plugins import PluginIndex
+
+PLUGIN_SOURCE = textwrap.dedent('''
+    import click
+
+    def hello(name: str):
+        'say hello.'
+        click.echo(f'hello {name}')
+
+    def rows():
+        return [{'id': 1}]
+
+    class Tools:
+        def version(self):
+            click.echo('1.0')
+''')
+
+
+def _install(path, entry_points: str):
+    (path / 'myplugins.py').write_text(PLUGIN_SOURCE)
+    (path / 'broken_plugin.py').write_text('raise ImportError("oops")\n')
+    dist_info = path / 'myplugins-1.0.dist-info'
+    dist_info.mkdir()
+    (dist_info / 'METADATA').write_text('Metadata-Version: 2.1\nName: myplugins\nVersion: 1.0\nSummary: my plugins\n')
+    (dist_info / 'entry_points.txt').write_text(entry_points)
+
+
+def test_plugins(tmp_path, monkeypatch):
+    site = tmp_path / 'site-packages'
+    site.mkdir()
+    _install(site, textwrap.dedent('''
+        [click_anno_test.plugins]
+        hello = myplugins:hello
+        tools = myplugins:Tools
+        broken = broken_plugin:cmd
+    '''))
+    monkeypatch.syspath_prepend(str(site))
+    monkeypatch.delitem(sys.modules, 'myplugins', raising=False)
+
+    class App:
+        def builtin(self):
+            pass
+
+    index = PluginIndex('click_anno_test.plugins', str(tmp_path / 'cache'))
+    app = click_app(App, plugins=index)
+
+    result = CliRunner().invoke(app, ['--help'])
+    assert result.exit_code == 0
+    for name in ('builtin', 'hello', 'tools', 'broken'):
+        assert name in result.output
+    assert 'my plugins' in result.output
+    assert 'myplugins' not in sys.modules # lazily
+    assert (tmp_path / 'cache' / 'click_anno_test.plugins.json').is_file()
+
+    result = CliRunner().invoke(app, ['hello', 'world'])
+    assert result.exit_code == 0
+    assert result.output == 'hello world\n'
+
+    result = CliRunner().invoke(app, ['tools', 'version'])
+    assert result.output == '1.0\n'
+
+    result = CliRunner(mix_stderr=False).invoke(app, ['broken'])
+    assert result.exit_code == 2
+    assert "unable to load plugin 'broken'" in result.stderr
+
+    result = CliRunner().invoke(app, ['builtin'])
+    assert result.exit_code == 0
+
+
+def test_plugin_index_cache(tmp_path, monkeypatch):
+    site = tmp_path / 'site-packages'
+    site.mkdir()
+    _install(site, '[click_anno_test.cached]\nhello = myplugins:hello\n')
+    monkeypatch.syspath_prepend(str(site))
+
+    directory = str(tmp_path / 'cache')
+    scanned = []
+    origin_scan = PluginIndex.scan
+    def scan(self):
+        scanned.append(self.group)
+        return origin_scan(self)
+    monkeypatch.setattr(PluginIndex, 'scan', scan)
+
+    for _ in range(2):
+        assert list(PluginIndex('click_anno_test.cached', directory).get_entries()) == ['hello']
+    assert len(scanned) == 1 # cached
+
+    (site / 'new_file').write_text('') # site changed
+    assert list(PluginIndex('click_anno_test.cached', directory).get_entries()) == ['hello']
+    assert len(scanned) == 2
+
+
+def _hide_stdlib_metadata(monkeypatch):
+    import importlib
+    import importlib.metadata
+    stdlib = importlib.metadata
+    monkeypatch.delattr(importlib, 'metadata')
+    monkeypatch.setitem(sys.modules, 'importlib.metadata', None)
+    return stdlib
+
+def test_plugins_metadata_backport(monkeypatch):
+    from click_anno.plugins import _get_metadata
+
+    stdlib = _hide_stdlib_metadata(monkeypatch)
+    monkeypatch.setitem(sys.modules, 'importlib_metadata', stdlib) # as the backport on python 3.7
+    assert _get_metadata() is stdlib
+
+def test_plugins_metadata_missing(monkeypatch, tmp_path):
+    from pytest import raises
+
+    _hide_stdlib_metadata(monkeypatch)
+    monkeypatch.setitem(sys.modules, 'importlib_metadata', None)
+    with raises(ImportError, match='importlib_metadata'):
+        PluginIndex('missing.group', directory=str(tmp_path)).get_entries()
+
+
+def test_plugin_index_key_ignores_cwd(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend('')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    key = PluginIndex.get_state_key()
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'source.py').write_text('')
+    assert PluginIndex.get_state_key() == key
+
+
+def test_plugins_summary_and_defaults(tmp_path, monkeypatch):
+    site = tmp_path / 'site-packages'
+    site.mkdir()
+    _install(site, '[click_anno_test.summary]\nhello = myplugins:hello\nrows = myplugins:rows\n')
+    monkeypatch.syspath_prepend(str(site))
+    monkeypatch.delitem(sys.modules, 'myplugins', raising=False)
+
+    class App:
+        pass
+
+    directory = str(tmp_path / 'cache')
+    def make_app():
+        return click_app(App, plugins=PluginIndex('click_anno_test.summary', directory), output='jsonl')
+
+    result = CliRunner().invoke(make_app(), ['--help'])
+    assert 'my plugins' in result.output
+    assert 'say hello' not in result.output
+
+    result = CliRunner().invoke(make_app(), ['hello', 'world'])
+    assert result.output == 'hello world\n'
+
+    result = CliRunner().invoke(make_app(), ['--help'])
+    assert 'say hello.' in result.output # from the index on disk
+
+    result = CliRunner().invoke(make_app(), ['rows'])
+    assert result.exit_code == 0
+    assert result.output == '{"id":1}\n'
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+import io
+import time
+import typing
+
+import click
+from click.testing import CliRunner
+
+from click_anno import attrs, click_app, command
+from click_anno import instrument
+from click_anno.progress import Progress
+
+
+def _invoke(cmd, args, **kwargs):
+    events = []
+    instrument.add_listener(events.append)
+    try:
+        result = CliRunner().invoke(cmd, args, **kwargs)
+    finally:
+        instrument.remove_listener(events.append)
+    return result, [x for x in events if x['event'] == 'progress']
+
+def test_progress_stream():
+    @command
+    @attrs(progress=True)
+    def total(ids: typing.Iterator[int]):
+        click.echo(str(sum(ids)))
+
+    result, events = _invoke(total, ['-'], input='1\n2\n3\n')
+    assert result.exit_code == 0
+    assert result.output == '6\n' # not a tty, nothing rendered
+    assert len(events) == 1
+    assert events[0]['command'] == 'total'
+    assert events[0]['counters'][0]['name'] == 'ids'
+    assert events[0]['counters'][0]['count'] == 3
+
+def test_progress_file(tmp_path):
+    class App:
+        def size(self, src: click.File('rb')):
+            click.echo(str(sum(len(x) for x in src)))
+
+    path = tmp_path / 'data'
+    path.write_bytes(b'a\n' * 1000)
+    result, events = _invoke(click_app(App, progress=True), ['size', str(path)])
+    assert result.exit_code == 0
+    assert result.output == '2000\n'
+    counter = events[0]['counters'][0]
+    assert (counter['unit'], counter['count'], counter['total']) == ('bytes', 2000, 2000)
+
+def test_progress_disabled():
+    @command
+    def total(ids: typing.Iterator[int]):
+        click.echo(str(sum(ids)))
+
+    result, events = _invoke(total, ['1', '2'])
+    assert result.output == '3\n'
+    assert events == []
+
+def test_progress_render():
+    class TTY(io.StringIO):
+        def isatty(self):
+            return True
+
+    stream = TTY()
+    progress = Progress('app', stream=stream, interval=0.01)
+    items = progress.wrap('ids', iter(range(3)))
+    progress.start()
+    for _ in items:
+        time.sleep(0.02)
+    progress.close()
+    output = stream.getvalue()
+    assert output.startswith('\r')
+    assert output.endswith('\n')
+    assert 'ids: 3 items' in output.splitlines()[-1]
+
+def test_progress_lazy_text_file(tmp_path):
+    @command
+    @attrs(progress=True)
+    def count(src: click.File('r', encoding='utf-8', lazy=True)):
+        click.echo(str(sum(1 for _ in src)))
+
+    path = tmp_path / 'data'
+    path.write_bytes('中文\n'.encode('utf-8') * 10)
+    result, events = _invoke(count, [str(path)])
+    assert result.exit_code == 0
+    assert result.output == '10\n'
+    counter = events[0]['counters'][0]
+    assert (counter['unit'], counter['count'], counter['total']) == ('bytes', 70, 70) # not chars
+
+def test_progress_text_stream():
+    progress = Progress('app')
+    fp = progress.wrap('src', io.StringIO('中文\n' * 10)) # unseekable text counts the chars
+    progress.start()
+    assert sum(1 for _ in fp) == 10
+    progress.close()
+    counter = progress.counters[0]
+    assert (counter.unit, counter.get_count()) == ('chars', 30)
+
+def test_progress_closed_text_file(tmp_path):
+    path = tmp_path / 'data'
+    path.write_bytes('中文\n'.encode('utf-8') * 10)
+    progress = Progress('app')
+    with progress.wrap('src', open(path, encoding='utf-8')) as fp:
+        progress.start()
+        fp.read()
+    progress.close()
+    assert progress.counters[0].get_count() == 70
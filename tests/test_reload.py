@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+import os
+import sys
+import importlib
+import textwrap
+
+from click.testing import CliRunner
+
+from click_anno import click_app
+from click_anno.reload import Reloader
+
+def _write_module(path, text: str, mtime: int):
+    path.write_text(textwrap.dedent(text))
+    os.utime(path, (mtime, mtime))
+
+def test_reload_changed_subtree(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    _write_module(tmp_path / 'reload_main.py', '''
+        import click
+        from reload_sub import Sub
+
+        class App:
+            def hello(self):
+                click.echo('hello')
+
+            sub = Sub
+        ''', 1_000_000)
+    _write_module(tmp_path / 'reload_sub.py', '''
+        import click
+
+        class Sub:
+            def run(self):
+                click.echo('v1')
+        ''', 1_000_000)
+
+    main = importlib.import_module('reload_main')
+    try:
+        app = click_app(main.App)
+        reloader = Reloader(app)
+        hello = app.commands['hello']
+        assert CliRunner().invoke(app, ['sub', 'run']).output == 'v1\n'
+        assert not reloader.check()
+
+        _write_module(tmp_path / 'reload_sub.py', '''
+            import click
+
+            class Sub:
+                def run(self):
+                    click.echo('v2')
+
+                def new(self):
+                    click.echo('new')
+            ''', 2_000_000)
+        assert reloader.check()
+
+        assert CliRunner().invoke(app, ['sub', 'run']).output == 'v2\n'
+        assert CliRunner().invoke(app, ['sub', 'new']).output == 'new\n'
+        assert app.commands['hello'] is hello # unaffected
+    finally:
+        sys.modules.pop('reload_main', None)
+        sys.modules.pop('reload_sub', None)
+
+def test_reload_root(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    _write_module(tmp_path / 'reload_root.py', '''
+        import click
+        from click_anno import click_app
+
+        @click_app
+        class App:
+            def hello(self):
+                click.echo('v1')
+        ''', 1_000_000)
+
+    module = importlib.import_module('reload_root')
+    try:
+        app = module.App
+        reloader = Reloader(app)
+        assert CliRunner().invoke(app, ['hello']).output == 'v1\n'
+
+        _write_module(tmp_path / 'reload_root.py', '''
+            import click
+            from click_anno import click_app
+
+            @click_app
+            class App:
+                def hello(self):
+                    click.echo('v2')
+            ''', 2_000_000)
+        assert reloader.check()
+        assert CliRunner().invoke(app, ['hello']).output == 'v2\n'
+    finally:
+        sys.modules.pop('reload_root', None)
+
+def test_reload_keeps_unchanged_nested_groups(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    main_source = '''
+        import click
+        from reload_kept_sub import Sub
+
+        class App:
+            def hello(self):
+                click.echo('{}')
+
+            sub = Sub
+        '''
+    _write_module(tmp_path / 'reload_kept_main.py', main_source.format('v1'), 1_000_000)
+    _write_module(tmp_path / 'reload_kept_sub.py', '''
+        import click
+
+        class Sub:
+            def run(self):
+                click.echo('sub')
+
+            class Inner:
+                def run(self):
+                    click.echo('inner')
+        ''', 1_000_000)
+
+    main = importlib.import_module('reload_kept_main')
+    try:
+        app = click_app(main.App)
+        reloader = Reloader(app)
+        sub = app.commands['sub']
+
+        _write_module(tmp_path / 'reload_kept_main.py', main_source.format('v2'), 2_000_000)
+        assert reloader.check()
+
+        assert CliRunner().invoke(app, ['hello']).output == 'v2\n'
+        assert app.commands['sub'] is sub # not rebuilt
+        assert CliRunner().invoke(app, ['sub', 'inner', 'run']).output == 'inner\n'
+    finally:
+        sys.modules.pop('reload_kept_main', None)
+        sys.modules.pop('reload_kept_sub', None)
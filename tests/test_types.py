@@ -169,3 +169,284 @@ def test_register_param_type():
     result = CliRunner().invoke(func, ['abc'])
     assert result.exit_code == 0
     assert result.output == "'abc'\n"
+
+def test_array():
+    from array import array
+
+    @command
+    def func(values: array('d')):
+        assert isinstance(values, array)
+        click.echo(f'{values.typecode} {sum(values)!r}')
+
+    result = CliRunner().invoke(func, ['1', '2.5'])
+    assert result.exit_code == 0
+    assert result.output == 'd 3.5\n'
+
+    result = CliRunner().invoke(func, ['1', 'x'])
+    assert result.exit_code == 2
+    assert 'x is not a valid floating point value' in result.output
+
+def test_array_option():
+    from array import array
+
+    @command
+    def func(*, values: array('i') = array('i')):
+        assert isinstance(values, array)
+        click.echo(f'{values.tolist()!r}')
+
+    result = CliRunner().invoke(func, ['--values', '1', '--values', '2'])
+    assert result.exit_code == 0
+    assert result.output == '[1, 2]\n'
+
+    result = CliRunner().invoke(func, [])
+    assert result.exit_code == 0
+    assert result.output == '[]\n'
+
+    result = CliRunner().invoke(func, ['--values', str(2 ** 40)])
+    assert result.exit_code == 2
+    assert 'is out of range' in result.output
+
+def test_array_var_positional():
+    from array import array
+
+    @command
+    def func(*values: array('d')):
+        assert isinstance(values, tuple)
+        click.echo(f'{values!r}')
+
+    result = CliRunner().invoke(func, ['1', '2.5'])
+    assert result.exit_code == 0
+    assert result.output == '(1.0, 2.5)\n'
+
+    result = CliRunner().invoke(func, ['1', 'x'])
+    assert result.exit_code == 2
+    assert 'x is not a valid floating point value' in result.output
+
+def test_array_converter():
+    import pytest
+    from array import array
+    from click.exceptions import BadParameter
+    from click_anno.types import get_array_converter
+
+    converter = get_array_converter(array('h'))
+    values = converter(None, None, ('1', '-2'))
+    assert (values.typecode, values.tolist()) == ('h', [1, -2])
+    assert converter(None, None, None).tolist() == []
+    with pytest.raises(BadParameter, match='70000 is out of range'):
+        converter(None, None, ('1', '70000'))
+    assert get_array_converter(list) is None
+
+def test_numpy_array():
+    import pytest
+    numpy = pytest.importorskip('numpy')
+    from numpy.typing import NDArray
+
+    @command
+    def func(values: NDArray[numpy.float64]):
+        assert isinstance(values, numpy.ndarray)
+        click.echo(f'{values.dtype} {float(values.sum())!r}')
+
+    result = CliRunner().invoke(func, ['1', '2.5'])
+    assert result.exit_code == 0, result.output
+    assert result.output == 'float64 3.5\n'
+
+    result = CliRunner().invoke(func, ['1', 'x'])
+    assert result.exit_code == 2
+    assert 'x is not a valid floating point value' in result.output
+
+def test_stream():
+    from typing import Iterator
+
+    @command
+    def func(ids: Iterator[int]):
+        assert not isinstance(ids, tuple)
+        click.echo(f'{list(ids)!r}')
+
+    result = CliRunner().invoke(func, ['1', '-', '4'], input='2\n3\n')
+    assert result.exit_code == 0
+    assert result.output == '[1, 2, 3, 4]\n'
+
+    result = CliRunner().invoke(func, ['1', 'x'])
+    assert result.exit_code == 2
+    assert 'x is not a valid integer' in result.output
+
+def test_stream_from_file_with_nul(tmp_path):
+    from click_anno import stream
+
+    path = tmp_path / 'args'
+    path.write_text('a b\0c\0')
+
+    @command
+    def func(names: stream(str, delimiter='\0')):
+        click.echo(f'{list(names)!r}')
+
+    result = CliRunner().invoke(func, [f'@{path}'])
+    assert result.exit_code == 0
+    assert result.output == "['a b', 'c']\n"
+
+    result = CliRunner().invoke(func, [f'@{tmp_path / "missing"}'])
+    assert result.exit_code == 2
+    assert 'unable to read' in result.output
+
+def test_stream_var_positional():
+    from typing import Iterator
+    import pytest
+
+    with pytest.raises(ValueError):
+        @command
+        def func(*ids: Iterator[int]):
+            pass
+
+
+def test_lazy_default():
+    from click_anno import lazy_default
+
+    calls = []
+    def get_branch():
+        calls.append(1)
+        return 'main'
+
+    @command
+    def func(branch: str = lazy_default(get_branch, placeholder='current branch'), n: int = lazy_default(lambda: 1)):
+        click.echo(f'{branch} {n!r}')
+
+    result = CliRunner().invoke(func, ['--help'])
+    assert result.exit_code == 0
+    assert '[default: (current branch)]' in result.output
+    assert calls == []
+
+    result = CliRunner().invoke(func, ['--branch', 'dev'])
+    assert result.output == 'dev 1\n'
+    assert calls == []
+
+    for _ in range(2):
+        result = CliRunner().invoke(func, [])
+        assert result.output == 'main 1\n'
+    assert calls == [1] # memoized
+
+
+def test_lazy_default_ttl():
+    from click_anno import lazy_default
+
+    values = iter(range(10))
+    value = lazy_default(lambda: next(values), ttl=0)
+    assert value() == 0
+    assert value() == 1
+
+    value = lazy_default(lambda: next(values))
+    assert value() == value() == 2
+    value.clear()
+    assert value() == 3
+
+
+def test_register_param_type_with_cache(tmp_path):
+    import os
+    from click_anno.types import register_param_type
+
+    class Resolved:
+        def __init__(self, value):
+            self.value = value
+
+    calls = []
+
+    class ResolvedParamType(click.ParamType):
+        name = 'resolved'
+
+        def convert(self, value, param, ctx):
+            calls.append(value)
+            return Resolved(os.path.realpath(value))
+
+    param_type = register_param_type(Resolved, ResolvedParamType(), cache={'max_size': 2, 'check_mtime': True})
+
+    @command
+    def func(r: Resolved):
+        click.echo(os.path.basename(r.value))
+
+    path = tmp_path / 'a'
+    path.write_text('')
+    for _ in range(3):
+        result = CliRunner().invoke(func, [str(path)])
+        assert result.output == 'a\n'
+    assert calls == [str(path)]
+    assert param_type.stats() == {'hits': 2, 'misses': 1, 'evictions': 0, 'size': 1}
+
+    os.utime(str(path), ns=(0, 0)) # changed
+    CliRunner().invoke(func, [str(path)])
+    assert len(calls) == 2
+
+    CliRunner().invoke(func, ['b'])
+    CliRunner().invoke(func, ['c'])
+    assert param_type.stats()['evictions'] == 1
+
+def test_literal_choice():
+    from typing import Literal
+
+    @command
+    def func(mode: Literal['debug', 'release'], *, level: Literal[1, 2] = 1):
+        click.echo(f'{mode} {level!r}')
+
+    result = CliRunner().invoke(func, ['debug'])
+    assert result.exit_code == 0
+    assert result.output == 'debug 1\n'
+
+    result = CliRunner().invoke(func, ['release', '--level', '2'])
+    assert result.exit_code == 0
+    assert result.output == 'release 2\n'
+
+    result = CliRunner().invoke(func, ['rel'])
+    assert result.exit_code == 2
+    assert 'invalid choice: rel. (choose from debug, release)' in result.output
+
+    result = CliRunner().invoke(func, ['--help'])
+    assert '--level [1|2]' in result.output
+
+def test_frozenset_choice():
+    @command
+    def func(color: frozenset({'red', 'green'}), *, size=frozenset({'s', 'm'})):
+        click.echo(f'{color} {size}')
+
+    result = CliRunner().invoke(func, ['red'])
+    assert result.exit_code == 0
+    assert result.output == 'red None\n'
+
+    result = CliRunner().invoke(func, ['green', '--size', 'm'])
+    assert result.exit_code == 0
+    assert result.output == 'green m\n'
+
+    result = CliRunner().invoke(func, ['blue'])
+    assert result.exit_code == 2
+
+def test_choice_options():
+    from click_anno import choice
+
+    @command
+    def func(mode: choice('debug', 'release', 'relwithdebinfo', case_sensitive=False, prefix=True)):
+        click.echo(mode)
+
+    result = CliRunner().invoke(func, ['DEBUG'])
+    assert result.exit_code == 0
+    assert result.output == 'debug\n'
+
+    result = CliRunner().invoke(func, ['RelW'])
+    assert result.exit_code == 0
+    assert result.output == 'relwithdebinfo\n'
+
+    result = CliRunner().invoke(func, ['rel'])
+    assert result.exit_code == 2
+    assert 'ambiguous choice: rel. (could be release, relwithdebinfo)' in result.output
+
+def test_choice_interned():
+    from typing import Literal
+    from click_anno import choice
+
+    @command
+    def a(mode: Literal['x', 'y']):
+        pass
+
+    @command
+    def b(mode: Literal['x', 'y']):
+        pass
+
+    assert a.params[0].type is b.params[0].type is choice('x', 'y')
+    assert choice('x', 'y') is not choice('x', 'y', prefix=True)
+    assert choice(1, 2) is not choice(True, 2)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2021~2999 - Cologler <skyoflw@gmail.com>
+# ----------
+#
+# ----------
+
+import time
+
+import click
+from click.testing import CliRunner
+from pytest import raises
+
+from click_anno import attrs, click_app, command
+from click_anno import instrument
+
+
+def _invoke(cmd, args):
+    events = []
+    instrument.add_listener(events.append)
+    try:
+        result = CliRunner(mix_stderr=False).invoke(cmd, args)
+    finally:
+        instrument.remove_listener(events.append)
+    return result, [x for x in events if x['event'] == 'watchdog']
+
+def _slow_work():
+    time.sleep(0.3)
+
+def test_watchdog_slow(tmp_path, monkeypatch):
+    monkeypatch.setenv('CLICK_ANNO_INSTRUMENT_DIR', str(tmp_path))
+
+    @command
+    @attrs(watchdog=0.05)
+    def slow():
+        _slow_work()
+        click.echo('done')
+
+    result, events = _invoke(slow, [])
+    assert result.exit_code == 0
+    assert result.stdout == 'done\n'
+    assert len(events) == 1
+    assert events[0]['command'] == 'slow'
+    assert events[0]['elapsed'] >= 0.3
+    assert events[0]['path'] in result.stderr
+
+    with open(events[0]['path'], encoding='utf-8') as fp:
+        lines = fp.read().splitlines()
+    assert lines
+    for line in lines:
+        stack, count = line.rsplit(' ', 1)
+        assert int(count) > 0
+    assert any(';_slow_work (' in x for x in lines)
+    assert sum(int(x.rsplit(' ', 1)[1]) for x in lines) == events[0]['samples']
+
+def test_watchdog_fast(tmp_path, monkeypatch):
+    monkeypatch.setenv('CLICK_ANNO_INSTRUMENT_DIR', str(tmp_path))
+
+    class App:
+        def fast(self):
+            click.echo('done')
+
+    result, events = _invoke(click_app(App, watchdog=10), ['fast'])
+    assert result.exit_code == 0
+    assert result.stderr == ''
+    assert events == []
+    assert list(tmp_path.iterdir()) == []
+
+def test_watchdog_invalid():
+    with raises(ValueError):
+        command(attrs(watchdog=0)(lambda: None))